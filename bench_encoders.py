@@ -0,0 +1,63 @@
+import argparse
+import random
+import time
+
+from dlgo import goboard_fast as goboard
+from dlgo.encoders.base import get_encoder_by_name
+
+
+def random_game(board_size, num_moves):
+    # The positions of one game of random moves, like the states a
+    # data processor replays from an SGF file
+    game_state = goboard.GameState.new_game(board_size)
+    states = []
+    for _ in range(num_moves):
+        moves = [move for move in game_state.legal_moves() if move.is_play]
+        if not moves:
+            break
+        game_state = game_state.apply_move(random.choice(moves))
+        states.append(game_state)
+    return states
+
+
+def measure(encoder, states):
+    start = time.perf_counter()
+    for game_state in states:
+        encoder.encode(game_state)
+    single = (time.perf_counter() - start) / len(states)
+    start = time.perf_counter()
+    encoder.encode_batch(states)
+    batch = (time.perf_counter() - start) / len(states)
+    return single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure encoding time per position.")
+    parser.add_argument("--board-size", type=int, default=19)
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument(
+        "--encoders", nargs="+", default=["oneplane", "sevenplane", "historyplane"]
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    states = []
+    start = time.perf_counter()
+    for _ in range(args.games):
+        states.extend(random_game(args.board_size, args.moves))
+    replay = (time.perf_counter() - start) / len(states)
+
+    print(f"{'encoder':>12}{'planes':>8}{'encode us':>11}{'batch us':>10}")
+    for name in args.encoders:
+        encoder = get_encoder_by_name(name, args.board_size)
+        single, batch = measure(encoder, states)
+        print(
+            f"{name:>12}{encoder.shape()[0]:>8}{single * 1e6:>11.1f}"
+            f"{batch * 1e6:>10.1f}"
+        )
+    print(f"playing a random move and listing legal moves: {replay * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
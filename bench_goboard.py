@@ -0,0 +1,143 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+from dlgo import goboard, goboard_fast
+from dlgo.gotypes import Point
+
+ENGINES = {
+    "goboard": goboard,
+    "goboard_fast": goboard_fast,
+}
+
+
+def record_games(board_size, num_games, max_moves, seed):
+    # Plays random legal games once, so every engine replays the same moves
+    rng = random.Random(seed)
+    points = [
+        Point(row, col)
+        for row in range(1, board_size + 1)
+        for col in range(1, board_size + 1)
+    ]
+    games = []
+    for _ in range(num_games):
+        game = goboard_fast.GameState.new_game(board_size)
+        moves = []
+        while len(moves) < max_moves:
+            candidates = [point for point in points if game.board.get(point) is None]
+            rng.shuffle(candidates)
+            for point in candidates:
+                move = goboard_fast.Move.play(point)
+                if game.is_valid_move(move):
+                    break
+            else:
+                break
+            moves.append(point)
+            game = game.apply_move(move)
+        games.append(moves)
+    return games
+
+
+def bench_apply_move(engine, board_size, games):
+    num_moves = 0
+    start = time.perf_counter()
+    for moves in games:
+        game = engine.GameState.new_game(board_size)
+        for point in moves:
+            game = game.apply_move(engine.Move.play(point))
+        num_moves += len(moves)
+    return num_moves / (time.perf_counter() - start)
+
+
+def bench_probe(engine, board_size, games, probes_per_move, seed):
+    # Each probe asks the two questions is_valid_move needs for a play
+    rng = random.Random(seed)
+    num_probes = 0
+    elapsed = 0.0
+    for moves in games:
+        game = engine.GameState.new_game(board_size)
+        for point in moves:
+            empty = [
+                Point(row, col)
+                for row in range(1, board_size + 1)
+                for col in range(1, board_size + 1)
+                if game.board.get(Point(row, col)) is None
+            ]
+            candidates = rng.sample(empty, min(probes_per_move, len(empty)))
+            player = game.next_player
+            start = time.perf_counter()
+            for candidate in candidates:
+                move = engine.Move.play(candidate)
+                game.is_move_self_capture(player, move)
+                game.does_move_violate_ko(player, move)
+            elapsed += time.perf_counter() - start
+            num_probes += len(candidates)
+            game = game.apply_move(engine.Move.play(point))
+    return num_probes / elapsed
+
+
+def bench_allocations(engine, board_size, games):
+    # Traces the memory each place_stone allocates: peak bytes above what
+    # was allocated before the call, and blocks still held after it
+    tracemalloc.start()
+    peak_bytes = 0
+    kept_blocks = 0
+    num_moves = 0
+    for moves in games:
+        board = engine.Board(board_size, board_size)
+        player = engine.GameState.new_game(board_size).next_player
+        for point in moves:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            board.place_stone(player, point)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            peak_bytes += peak - current
+            kept_blocks += sum(
+                stat.count_diff for stat in after.compare_to(before, "filename")
+            )
+            num_moves += 1
+            player = player.other
+    tracemalloc.stop()
+    return peak_bytes / num_moves, kept_blocks / num_moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Go board engines.")
+    parser.add_argument("--board-size", type=int, default=19)
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--moves", type=int, default=250)
+    parser.add_argument("--probes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help="trace memory allocated per place_stone instead of timing",
+    )
+    args = parser.parse_args()
+
+    games = record_games(args.board_size, args.games, args.moves, args.seed)
+    print(
+        f"{len(games)} games on {args.board_size}x{args.board_size}, "
+        f"{sum(len(moves) for moves in games)} moves"
+    )
+    if args.allocations:
+        print(f"{'engine':<14}{'peak bytes/move':>16}{'blocks kept/move':>18}")
+        for name, engine in ENGINES.items():
+            peak_bytes, kept_blocks = bench_allocations(engine, args.board_size, games)
+            print(f"{name:<14}{peak_bytes:>16.0f}{kept_blocks:>18.1f}")
+        return
+
+    print(f"{'engine':<14}{'apply_move/s':>14}{'probes/s':>12}")
+    for name, engine in ENGINES.items():
+        moves_per_second = bench_apply_move(engine, args.board_size, games)
+        probes_per_second = bench_probe(
+            engine, args.board_size, games, args.probes, args.seed
+        )
+        print(f"{name:<14}{moves_per_second:>14.0f}{probes_per_second:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import random
+import time
+
+from dlgo import goboard_fast as goboard
+from dlgo.agent.mcts_threaded import ThreadedMCTSAgent
+from dlgo.gotypes import Player
+
+
+class SleepingRolloutAgent(ThreadedMCTSAgent):
+    # Stands in for a rollout that releases the GIL, such as a
+    # NumPy-vectorized playout: the thread sleeps instead of playing
+    rollout_seconds = 0.001
+
+    def simulate_random_game(self, game_state):
+        time.sleep(self.rollout_seconds)
+        return random.choice([Player.black, Player.white])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure threaded MCTS playouts per second against thread count."
+    )
+    parser.add_argument("--board-size", type=int, default=9)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument(
+        "--rollout",
+        choices=["random", "sleep"],
+        default="random",
+        help="play real random rollouts, or sleep outside the GIL instead",
+    )
+    parser.add_argument("--rollout-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    agent_class = ThreadedMCTSAgent
+    if args.rollout == "sleep":
+        agent_class = SleepingRolloutAgent
+        SleepingRolloutAgent.rollout_seconds = args.rollout_ms / 1000
+
+    game_state = goboard.GameState.new_game(args.board_size)
+    print(f"{'threads':>8}{'playouts/s':>14}{'speedup':>10}")
+    baseline = None
+    for num_threads in args.threads:
+        agent = agent_class(args.rounds, 1.4, num_threads=num_threads)
+        start = time.perf_counter()
+        agent.select_move(game_state)
+        playouts_per_second = args.rounds / (time.perf_counter() - start)
+        if baseline is None:
+            baseline = playouts_per_second
+        print(
+            f"{num_threads:>8}{playouts_per_second:>14.0f}"
+            f"{playouts_per_second / baseline:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from dlgo import goboard_fast as goboard
+from dlgo.agent.naive import RandomBot
+from dlgo.playout import play_random_game
+
+
+def bot_playout(game_state):
+    # What a playout costs when played with RandomBot and GameState
+    bot = RandomBot()
+    while not game_state.is_over():
+        game_state = game_state.apply_move(bot.select_move(game_state))
+
+
+def measure(playout, game_state, num_games):
+    start = time.perf_counter()
+    for _ in range(num_games):
+        playout(game_state)
+    return num_games / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure random playouts per second.")
+    parser.add_argument("--board-size", type=int, nargs="+", default=[9, 19])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--bot-games", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'board':>6}{'RandomBot/s':>14}{'playout/s':>12}{'speedup':>10}")
+    for board_size in args.board_size:
+        game_state = goboard.GameState.new_game(board_size)
+        bot_rate = measure(bot_playout, game_state, args.bot_games)
+        playout_rate = measure(play_random_game, game_state, args.games)
+        print(
+            f"{board_size:>6}{bot_rate:>14.1f}{playout_rate:>12.0f}"
+            f"{playout_rate / bot_rate:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
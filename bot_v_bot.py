@@ -1,6 +1,6 @@
 import time
 
-from dlgo import goboard_slow as goboard
+from dlgo import goboard_fast as goboard
 from dlgo import gotypes
 from dlgo.agent import naive as agent
 from dlgo.utils import print_board, print_move
@@ -1,4 +1,4 @@
-from dlgo.goboard_slow import GameState
+from dlgo.goboard_fast import GameState
 
 
 class Agent:
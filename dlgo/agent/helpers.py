@@ -1,4 +1,7 @@
-from dlgo.goboard_slow import Board
+import random
+from typing import List
+
+from dlgo.goboard_fast import Board, GameState, GoString, Move
 from dlgo.gotypes import Player, Point
 
 
@@ -15,13 +18,7 @@ def is_point_an_eye(board: Board, point: Point, color: Player):
     off_board_corners = 0
     # We must control three out of four corners if the point
     # is in the middle of the board; on the edge, you must control all corners.
-    corners = [
-        Point(point.row - 1, point.col - 1),
-        Point(point.row - 1, point.col + 1),
-        Point(point.row + 1, point.col - 1),
-        Point(point.row + 1, point.col + 1),
-    ]
-    for corner in corners:
+    for corner in point.corners():
         if board.is_on_grid(corner):
             corner_color = board.get(corner)
             if corner_color == color:
@@ -33,3 +30,56 @@ def is_point_an_eye(board: Board, point: Point, color: Player):
         return off_board_corners + friendly_corners == 4
     # Point is in the middle.
     return friendly_corners >= 3
+
+
+# Cheap estimate of how urgent each move is, for searching the most
+# promising moves first: captures, saving our own strings from atari,
+# ataris and moves near the last move score high, filling our own eyes
+# scores low, passing and resigning lowest. Liberties are read off the
+# strings around the move; no stone is placed.
+def move_priorities(game_state: GameState, moves: List[Move]) -> List[float]:
+    board = game_state.board
+    neighbors = board.neighbor_table()
+    player = game_state.next_player
+    last_move = game_state.last_move
+    last_point = last_move.point if last_move is not None else None
+    priorities = []
+    for move in moves:
+        if not move.is_play:
+            priorities.append(-2.0 if move.is_resign else -1.0)
+            continue
+        point = move.point
+        index = board.index_of(point)
+        if board.is_eye(index, player):
+            priorities.append(-0.5)
+            continue
+        priority = 0.0
+        seen: List[GoString] = []
+        for neighbor in neighbors[index]:
+            string = board.string_at(neighbor)
+            if string is None or string in seen:
+                continue
+            seen.append(string)
+            num_liberties = len(string.liberties)
+            if string.color is player:
+                if num_liberties == 1:
+                    priority += 5 + len(string.stones)
+            elif num_liberties == 1:
+                priority += 10 + len(string.stones)
+            elif num_liberties == 2:
+                priority += 3
+        if last_point is not None:
+            distance = abs(point.row - last_point.row) + abs(point.col - last_point.col)
+            if distance <= 2:
+                priority += 3 - distance
+        priorities.append(priority)
+    return priorities
+
+
+# The moves from least to most urgent, shuffled among equals
+def order_moves(game_state: GameState, moves: List[Move]) -> List[Move]:
+    keys = [
+        priority + 0.5 * random.random()
+        for priority in move_priorities(game_state, moves)
+    ]
+    return [move for _, move in sorted(zip(keys, moves), key=lambda pair: pair[0])]
@@ -1,14 +1,25 @@
 import math
 import random
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Set, Tuple
 
-from dlgo import agent
-from dlgo.goboard import GameState, Move
+import numpy as np
+
+from dlgo import playout
+from dlgo.agent.base import Agent
+from dlgo.agent.helpers import order_moves
+from dlgo.agent.search_budget import SearchBudget
+from dlgo.goboard_fast import GameState, Move
 from dlgo.gotypes import Player
 
+# Rounds between two checks whether the search can stop early
+EARLY_STOP_INTERVAL = 16
+
 
 class MCTSNode(object):
-    def __init__(self, game_state, parent=None, move=None) -> None:
+    def __init__(
+        self, game_state, parent=None, move=None, ordered=False, track_points=False
+    ) -> None:
         # The current state of the game at this node
         self.game_state: GameState = game_state
         self.parent: Optional[MCTSNode] = parent
@@ -19,20 +30,119 @@ class MCTSNode(object):
             Player.white: 0,
         }
         self.num_rollouts = 0
+        # Rollouts through this node that are still running; counted as
+        # losses until they finish, so parallel searches spread out
+        self.virtual_losses = 0
         self.children: List[MCTSNode] = []
+        # The move leading to each child; a shared child's own move may
+        # belong to another parent
+        self.child_moves: List[Move] = []
+        # Ordered nodes, and their children, expand their most urgent
+        # move first (see helpers.order_moves); the others a random one
+        self.ordered = ordered
         self.unvisited_moves = game_state.legal_moves()
+        if ordered:
+            self.unvisited_moves = order_moves(game_state, self.unvisited_moves)
+        # Statistics of the children, in the order of children, kept
+        # in arrays so that select_child scores them all at once: their
+        # wins for the player to move here, their rollouts plus virtual
+        # losses, and the sum of the latter. Most nodes are leaves, so
+        # the arrays are only made when the first child is added.
+        self.child_wins: Optional[np.ndarray] = None
+        self.child_visits: Optional[np.ndarray] = None
+        self.total_visits = 0
+        # With track_points, which children inherit, the flat board
+        # index of each child's move, 0 (a border cell) for pass and
+        # resign, to look up their AMAF statistics
+        self.track_points = track_points
+        self.child_points: Optional[np.ndarray] = None
+        # All-moves-as-first statistics for RAVE, indexed by flat board
+        # index: how often the player to move here played each point
+        # later in a round, and how often they won. Created by the
+        # first AMAF update.
+        self.amaf_wins: Optional[np.ndarray] = None
+        self.amaf_visits: Optional[np.ndarray] = None
+        # (parent, index) of every place this node's statistics are
+        # mirrored in; several with transpositions
+        self._slots: List[Tuple[MCTSNode, int]] = []
 
-    def add_random_child(self) -> "MCTSNode":
-        index = random.randint(0, len(self.unvisited_moves) - 1)
-        new_move = self.unvisited_moves.pop(index)
+    # Expands unvisited_moves[index], or, without an index, the most
+    # urgent move of an ordered node or a random move of the others
+    def add_random_child(
+        self,
+        transpositions: "Optional[TranspositionTable]" = None,
+        index: Optional[int] = None,
+    ) -> "MCTSNode":
+        unvisited_moves = self.unvisited_moves
+        if index is None and not self.ordered:
+            index = random.randint(0, len(unvisited_moves) - 1)
+        if index is not None:
+            # Swap the move to the end, so that popping it is O(1)
+            unvisited_moves[index], unvisited_moves[-1] = (
+                unvisited_moves[-1],
+                unvisited_moves[index],
+            )
+        new_move = unvisited_moves.pop()
         new_game_state = self.game_state.apply_move(new_move)
-        new_node = MCTSNode(new_game_state, self, new_move)
-        self.children.append(new_node)
+        if transpositions is None:
+            new_node = MCTSNode(
+                new_game_state, self, new_move, self.ordered, self.track_points
+            )
+        else:
+            # A position reached through another move order shares the
+            # node, and with it the statistics, found there first
+            key = transposition_key(new_game_state)
+            new_node = transpositions.get(key)
+            if new_node is None:
+                new_node = MCTSNode(
+                    new_game_state, self, new_move, self.ordered, self.track_points
+                )
+                transpositions.put(key, new_node)
+        self.add_child(new_move, new_node)
         return new_node
 
+    def add_child(self, move: Move, child: "MCTSNode") -> None:
+        index = len(self.children)
+        if self.child_visits is None or index == len(self.child_visits):
+            # Room for this child and every move still unvisited
+            self._grow_child_arrays(index + 1 + len(self.unvisited_moves))
+        self.children.append(child)
+        self.child_moves.append(move)
+        visits = child.num_rollouts + child.virtual_losses
+        self.child_wins[index] = child.win_counts[self.game_state.next_player]
+        self.child_visits[index] = visits
+        self.total_visits += visits
+        if self.track_points and move.is_play:
+            self.child_points[index] = self.game_state.board.index_of(move.point)
+        child._slots.append((self, index))
+
+    def _grow_child_arrays(self, size: int) -> None:
+        num_children = len(self.children)
+        for name, dtype, needed in (
+            ("child_wins", np.int32, True),
+            ("child_visits", np.int32, True),
+            ("child_points", np.intp, self.track_points),
+        ):
+            if not needed:
+                continue
+            grown = np.zeros(size, dtype=dtype)
+            old = getattr(self, name)
+            if old is not None:
+                grown[:num_children] = old[:num_children]
+            setattr(self, name, grown)
+
+    # Detaches this node from parents that are not in keep
+    def retain_parents(self, keep: Set[int]) -> None:
+        self._slots = [slot for slot in self._slots if id(slot[0]) in keep]
+
     def record_win(self, winner: Player) -> None:
         self.win_counts[winner] += 1
         self.num_rollouts += 1
+        for parent, index in self._slots:
+            if winner is parent.game_state.next_player:
+                parent.child_wins[index] += 1
+            parent.child_visits[index] += 1
+            parent.total_visits += 1
 
     def can_add_child(self) -> bool:
         return len(self.unvisited_moves) > 0
@@ -40,58 +150,365 @@ class MCTSNode(object):
     def is_terminal(self) -> bool:
         return self.game_state.is_over()
 
+    def add_virtual_loss(self) -> None:
+        self.virtual_losses += 1
+        for parent, index in self._slots:
+            parent.child_visits[index] += 1
+            parent.total_visits += 1
+
+    def revert_virtual_loss(self) -> None:
+        self.virtual_losses -= 1
+        for parent, index in self._slots:
+            parent.child_visits[index] -= 1
+            parent.total_visits -= 1
+
     def winning_frac(self, player) -> float:
-        return self.win_counts[player] / self.num_rollouts
+        return self.win_counts[player] / (self.num_rollouts + self.virtual_losses)
+
+
+# Identifies a node's position for the transposition table. Two states
+# match when stones, side to move and ko point match (see
+# GameState.zobrist_hash), and, since one more pass would end the game
+# after a pass, when both or neither were reached by passing.
+def transposition_key(game_state: GameState) -> Hashable:
+    last_move = game_state.last_move
+    return (
+        game_state.zobrist_hash(),
+        last_move is not None and last_move.is_pass,
+    )
+
+
+class TranspositionTable:
+    # Bounded map from transposition_key to the search node holding that
+    # position's statistics. When full, the least recently used entry is
+    # dropped; its node stays in the tree, but later transpositions into
+    # it are no longer found.
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._nodes: "OrderedDict[Hashable, MCTSNode]" = OrderedDict()
 
+    def get(self, key: Hashable) -> Optional[MCTSNode]:
+        node = self._nodes.get(key)
+        if node is not None:
+            self._nodes.move_to_end(key)
+        return node
+
+    def put(self, key: Hashable, node: MCTSNode) -> None:
+        self._nodes[key] = node
+        self._nodes.move_to_end(key)
+        if len(self._nodes) > self.max_entries:
+            self._nodes.popitem(last=False)
+
+    def clear(self) -> None:
+        self._nodes.clear()
+
+    # Drops every entry whose node is not among the given ones
+    def retain(self, nodes: List[MCTSNode]) -> None:
+        keep = {id(node) for node in nodes}
+        for key in [key for key, node in self._nodes.items() if id(node) not in keep]:
+            del self._nodes[key]
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+
+class MCTSAgent(Agent):
+    def __init__(
+        self,
+        num_round: Optional[int],
+        temperature: float,
+        transposition_table_size: Optional[int] = None,
+        reuse_tree: bool = True,
+        seconds_per_move: Optional[float] = None,
+        stop_early: bool = False,
+        widening_exponent: Optional[float] = None,
+        widening_scale: float = 2.0,
+        rave_equivalence: Optional[float] = None,
+    ) -> None:
+        Agent.__init__(self)
+        # A search ends after num_round rounds or seconds_per_move
+        # seconds, whichever comes first; either may be None. With
+        # stop_early it also ends once the best move is decided.
+        self.num_round = num_round
+        self.seconds_per_move = seconds_per_move
+        self.stop_early = stop_early
+        # Budget of the last search, with its rounds and rollouts/s
+        self.last_budget: Optional[SearchBudget] = None
+        self.temperature = temperature
+        # Transpositions share nodes only when a table size is given
+        self.transpositions: Optional[TranspositionTable] = None
+        if transposition_table_size:
+            self.transpositions = TranspositionTable(transposition_table_size)
+        # With reuse_tree, the root of the last search is kept and the
+        # next search continues from the node of the position it is in
+        self.reuse_tree = reuse_tree
+        self._root: Optional[MCTSNode] = None
+        # With a widening_exponent, nodes expand their moves most urgent
+        # first, and a node visited n times has at most
+        # widening_scale * (n + 1) ** widening_exponent children, so a
+        # small search goes deep into a few good moves instead of
+        # trying every move once
+        self.widening_exponent = widening_exponent
+        self.widening_scale = widening_scale
+        # With a rave_equivalence k, rollouts record their moves and
+        # selection blends in AMAF win rates with weight
+        # sqrt(k / (3 * child rollouts + k)), which fades as the child's
+        # own statistics grow
+        self.rave_equivalence = rave_equivalence
 
-class MCTSAgent(agent.Agent):
     def select_move(self, game_state: GameState) -> Move:
 
         # Start MCTS algorithm
-        root = MCTSNode(game_state)
+        root = self.start_search(game_state)
+        budget = SearchBudget(self.num_round, self.seconds_per_move)
+        self.last_budget = budget
+        budget.start()
 
-        for _ in range(self.num_round):
-            node = root
-            while not node.can_add_child() and not node.is_terminal():
-                node = self.select_child(node)
+        while budget.resources_left():
+            path = self.select_path(root)
 
-            if node.can_add_child():
-                # Adds new child node into the tree
-                node = node.add_random_child()
+            if self.rave_equivalence is None:
+                # Simulates random game from this node
+                winner = self.simulate_random_game(path[-1].game_state)
 
-            # Simulates random game from this node
-            winner = self.simulate_random_game(node.game_state)
-
-            while node is not None:
                 # Propagates the score back up the tree
-                node.record_win(winner)
-                node = node.parent
+                self.backpropagate(path, winner)
+            else:
+                moves: List[int] = []
+                winner = self.simulate_random_game(path[-1].game_state, moves)
+                self.backpropagate(path, winner)
+                self.backpropagate_amaf(path, winner, moves)
+            budget.record_round()
+
+            if (
+                self.stop_early
+                and budget.rounds % EARLY_STOP_INTERVAL == 0
+                and self.is_decided(root, budget.rounds_left())
+            ):
+                budget.stop()
 
         # Select a move after completing MCTS rollouts
+        return self.best_move(root)
+
+    # Returns the root to search from: the matching node of the last
+    # tree if it can be reused, a new node otherwise
+    def start_search(self, game_state: GameState) -> MCTSNode:
+        root = self._find_subtree(game_state) if self.reuse_tree else None
+        if root is None:
+            root = MCTSNode(
+                game_state,
+                ordered=self.widening_exponent is not None,
+                track_points=self.rave_equivalence is not None,
+            )
+            if self.transpositions is not None:
+                self.transpositions.clear()
+                self.transpositions.put(transposition_key(game_state), root)
+        else:
+            self._prune(root)
+        self._root = root if self.reuse_tree else None
+        return root
+
+    # Walks down from the root to a node that can still be expanded,
+    # expands it and returns the path taken, ending at the new node.
+    # With transpositions the tree is a graph and a node can have
+    # several parents, so the score is later propagated along this path
+    # rather than through node.parent.
+    def select_path(self, root: MCTSNode) -> List[MCTSNode]:
+        node = root
+        path = [root]
+        on_path = {id(root)}
+        while not self.can_expand(node) and not node.is_terminal():
+            child = self.select_child(node)
+            if id(child) in on_path:
+                # A transposition led back into this path
+                break
+            node = child
+            path.append(node)
+            on_path.add(id(node))
+
+        if self.can_expand(node):
+            # Adds new child node into the tree
+            child = node.add_random_child(
+                self.transpositions, self._expansion_index(node)
+            )
+            if id(child) not in on_path:
+                path.append(child)
+        return path
+
+    def can_expand(self, node: MCTSNode) -> bool:
+        if not node.can_add_child():
+            return False
+        if self.widening_exponent is None or not node.children:
+            return True
+        visits = node.num_rollouts + node.virtual_losses
+        max_children = self.widening_scale * (visits + 1) ** self.widening_exponent
+        return len(node.children) < max_children
+
+    # With RAVE, the unvisited move to expand next is the one with the
+    # best AMAF win rate so far; passing and resigning come last
+    def _expansion_index(self, node: MCTSNode) -> Optional[int]:
+        if self.rave_equivalence is None or node.amaf_visits is None:
+            return None
+        board = node.game_state.board
+        points = [
+            board.index_of(move.point) if move.is_play else 0
+            for move in node.unvisited_moves
+        ]
+        amaf_pct = (node.amaf_wins[points] + 1) / (node.amaf_visits[points] + 2)
+        amaf_pct[np.asarray(points) == 0] = 0.0
+        # Random tie-breaking among moves never played yet
+        amaf_pct += 1e-6 * np.random.random(len(points))
+        return int(np.argmax(amaf_pct))
+
+    @staticmethod
+    def backpropagate(path: List[MCTSNode], winner: Player) -> None:
+        for node in path:
+            node.record_win(winner)
+
+    # Counts the moves of a round into the AMAF statistics of every node
+    # on its path: a node gets the points that the player to move there
+    # played first, among the moves after it in the tree and in the
+    # rollout. Going up the path, the tree move below each node is put
+    # in front of the rollout, so each node costs two array updates.
+    @staticmethod
+    def backpropagate_amaf(
+        path: List[MCTSNode], winner: Player, rollout_moves: List[int]
+    ) -> None:
+        leaf_state = path[-1].game_state
+        board = leaf_state.board
+        # Player.value of whoever played first at each point, or 0
+        first_player = np.zeros(board.num_cells, dtype=np.int8)
+        if rollout_moves:
+            points = np.asarray(rollout_moves)
+            value = leaf_state.next_player.value
+            players = np.where(np.arange(len(points)) % 2 == 0, value, 3 - value)
+            played = points >= 0
+            points, first = np.unique(points[played], return_index=True)
+            first_player[points] = players[played][first]
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            value = node.game_state.next_player.value
+            if depth + 1 < len(path):
+                move = _move_between(node, path[depth + 1])
+                if move is not None and move.is_play:
+                    first_player[board.index_of(move.point)] = value
+            if node.amaf_visits is None:
+                node.amaf_wins = np.zeros(len(first_player), dtype=np.int32)
+                node.amaf_visits = np.zeros(len(first_player), dtype=np.int32)
+            played = first_player == value
+            node.amaf_visits += played
+            if winner.value == value:
+                node.amaf_wins += played
+
+    @staticmethod
+    def best_move(root: MCTSNode) -> Optional[Move]:
+        player = root.game_state.next_player
         best_move = None
         best_pct = -1.0
-        for child in root.children:
-            child_pct = child.winning_pct(game_state.next_player)
+        for move, child in zip(root.child_moves, root.children):
+            child_pct = child.winning_frac(player)
             if child_pct > best_pct:
                 best_pct = child_pct
-                best_move = child.move
+                best_move = move
         return best_move
 
+    # Whether best_move(root) would stay the same whatever the results
+    # of the given number of further rounds: even if they all went to
+    # one other child and all won, it would not pass the best child
+    # having lost them all. An unexpanded move could still win them all.
+    @staticmethod
+    def is_decided(root: MCTSNode, rounds_left: float) -> bool:
+        if rounds_left < 1:
+            return True
+        if root.can_add_child() or not root.children:
+            return False
+        player = root.game_state.next_player
+        fractions = [child.winning_frac(player) for child in root.children]
+        leader = root.children[fractions.index(max(fractions))]
+        leader_worst = leader.win_counts[player] / (leader.num_rollouts + rounds_left)
+        for child in root.children:
+            if child is leader:
+                continue
+            child_best = (child.win_counts[player] + rounds_left) / (
+                child.num_rollouts + rounds_left
+            )
+            if child_best >= leader_worst:
+                return False
+        return True
+
+    # Returns the node of the last search tree that game_state was
+    # reached at, following the moves played since that search, e.g.
+    # our own move and the opponent's reply; None if there is none.
+    def _find_subtree(self, game_state: GameState) -> Optional[MCTSNode]:
+        if self._root is None:
+            return None
+        moves = []
+        state = game_state
+        while state is not None and state is not self._root.game_state:
+            moves.append(state.last_move)
+            state = state.previous_state
+        if state is None:
+            return None
+        node = self._root
+        for move in reversed(moves):
+            for child_move, child in zip(node.child_moves, node.children):
+                if _same_move(child_move, move):
+                    node = child
+                    break
+            else:
+                return None
+        return node
+
+    # Makes root the root of the tree. The rest of the old tree is only
+    # reachable through parent links and the transposition table, so
+    # cutting those lets it be reclaimed.
+    def _prune(self, root: MCTSNode) -> None:
+        root.parent = None
+        nodes = [root]
+        seen = {id(root)}
+        for node in nodes:
+            for child in node.children:
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    nodes.append(child)
+        for node in nodes:
+            if node.parent is not None and id(node.parent) not in seen:
+                node.parent = None
+            node.retain_parents(seen)
+        if self.transpositions is not None:
+            self.transpositions.retain(nodes)
+
+    # Plays the game out with random moves that don't fill eyes, on a
+    # scratch copy of the board, and returns the winner. If given, moves
+    # gets the moves played, as described in playout.play_random_game.
+    @staticmethod
+    def simulate_random_game(
+        game_state: GameState, moves: Optional[List[int]] = None
+    ) -> Player:
+        return playout.play_random_game(game_state, moves=moves)
+
     def select_child(self, node: MCTSNode):
-        total_rollouts = sum(child.num_rollouts for child in node.children)
-        best_score = -1
-        best_child = None
-        for child in node.children:
-            score = uct_score(
-                total_rollouts,
-                child.num_rollouts,
-                child.winning_frac(node.game_state.next_player),
+        num_children = len(node.children)
+        if self.rave_equivalence is None or node.amaf_visits is None:
+            scores = uct_scores(
+                node.total_visits,
+                node.child_visits[:num_children],
+                node.child_wins[:num_children],
+                self.temperature,
+            )
+        else:
+            points = node.child_points[:num_children]
+            scores = rave_scores(
+                node.total_visits,
+                node.child_visits[:num_children],
+                node.child_wins[:num_children],
+                node.amaf_visits[points],
+                node.amaf_wins[points],
                 self.temperature,
+                self.rave_equivalence,
             )
-            if score > best_score:
-                best_score = score
-                best_child = child
-        return best_child
+        return node.children[int(np.argmax(scores))]
 
 
 def uct_score(
@@ -99,3 +516,44 @@ def uct_score(
 ) -> float:
     exploration = math.sqrt(math.log(parent_rollouts) / child_rollouts)
     return win_pct + temperature * exploration
+
+
+# uct_score of all children of a node at once
+def uct_scores(
+    parent_rollouts: int,
+    child_rollouts: np.ndarray,
+    child_wins: np.ndarray,
+    temperature: float,
+) -> np.ndarray:
+    exploration = np.sqrt(math.log(parent_rollouts) / child_rollouts)
+    return child_wins / child_rollouts + temperature * exploration
+
+
+# uct_scores with the win rate blended with the AMAF win rate
+def rave_scores(
+    parent_rollouts: int,
+    child_rollouts: np.ndarray,
+    child_wins: np.ndarray,
+    amaf_rollouts: np.ndarray,
+    amaf_wins: np.ndarray,
+    temperature: float,
+    equivalence: float,
+) -> np.ndarray:
+    beta = np.sqrt(equivalence / (3 * child_rollouts + equivalence))
+    beta[amaf_rollouts == 0] = 0.0
+    win_pct = child_wins / child_rollouts
+    amaf_pct = amaf_wins / np.maximum(amaf_rollouts, 1)
+    exploration = np.sqrt(math.log(parent_rollouts) / child_rollouts)
+    return (1 - beta) * win_pct + beta * amaf_pct + temperature * exploration
+
+
+# The move that leads from parent to child
+def _move_between(parent: MCTSNode, child: MCTSNode) -> Optional[Move]:
+    for slot_parent, index in child._slots:
+        if slot_parent is parent:
+            return parent.child_moves[index]
+    return None
+
+
+def _same_move(a: Move, b: Move) -> bool:
+    return a.point == b.point and a.is_pass == b.is_pass and a.is_resign == b.is_resign
@@ -0,0 +1,81 @@
+import random
+from typing import List, Optional
+
+import numpy as np
+
+from dlgo.agent.mcts import MCTSAgent
+from dlgo.agent.node_store import ROOT, NodeStore
+from dlgo.goboard_fast import GameState, Move
+
+
+class CompactMCTSAgent(MCTSAgent):
+    """MCTS agent whose tree lives in a NodeStore rather than MCTSNodes.
+
+    A node is expanded with all of its children at once, in random
+    order, and the children are then visited in that order before UCT
+    picks between them, so the search matches MCTSAgent's one random
+    unvisited child per round. Node states are replayed on demand and
+    only state_cache_size of them are kept.
+    """
+
+    def __init__(
+        self,
+        num_round: int,
+        temperature: float,
+        capacity: int = 1 << 16,
+        state_cache_size: int = 4096,
+    ) -> None:
+        MCTSAgent.__init__(self, num_round, temperature, reuse_tree=False)
+        self.capacity = capacity
+        self.state_cache_size = state_cache_size
+
+    def select_move(self, game_state: GameState) -> Optional[Move]:
+        store = NodeStore(self.capacity, self.state_cache_size)
+        store.reset(game_state)
+
+        for _ in range(self.num_round):
+            path = self.select_leaf(store)
+
+            # Simulates random game from this node
+            winner = self.simulate_random_game(store.state(path[-1]))
+
+            # Propagates the score back up the tree
+            store.backpropagate(path, winner)
+
+        # Select a move after completing MCTS rollouts
+        children = store.children(ROOT)
+        if not children:
+            return None
+        visits = store.visits[children.start : children.stop]
+        wins = store.wins[children.start : children.stop]
+        win_pct = np.where(visits > 0, wins / np.maximum(visits, 1), -1.0)
+        return store.decode_move(int(store.move[children.start + np.argmax(win_pct)]))
+
+    # Walks down from the root until it reaches a child that was never
+    # visited, or the end of a game, and returns the nodes on the way
+    def select_leaf(self, store: NodeStore) -> List[int]:
+        node = ROOT
+        path = [ROOT]
+        while True:
+            if not store.is_expanded(node):
+                moves = store.state(node).legal_moves()
+                random.shuffle(moves)
+                store.expand(node, moves)
+            if store.is_terminal(node):
+                return path
+            first = store.first_child[node]
+            visits = store.visits[first : first + store.num_children[node]]
+            unvisited = np.flatnonzero(visits == 0)
+            if len(unvisited):
+                path.append(int(first + unvisited[0]))
+                return path
+            node = self.select_child_index(store, node)
+            path.append(node)
+
+    def select_child_index(self, store: NodeStore, node: int) -> int:
+        first = store.first_child[node]
+        end = first + store.num_children[node]
+        visits = store.visits[first:end]
+        win_pct = store.wins[first:end] / visits
+        exploration = np.sqrt(np.log(visits.sum()) / visits)
+        return int(first + np.argmax(win_pct + self.temperature * exploration))
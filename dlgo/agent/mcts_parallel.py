@@ -0,0 +1,173 @@
+import multiprocessing
+import random
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from dlgo.agent.mcts import MCTSAgent, MCTSNode
+from dlgo.goboard_fast import GameState, Move
+from dlgo.gotypes import Player
+
+ROOT_PARALLEL = "root"
+LEAF_PARALLEL = "leaf"
+
+
+def seed_worker():
+    # Forked workers start with the parent's random state;
+    # reseed so that they don't all play the same rollouts
+    random.seed()
+
+
+def search_tree(jobinfo) -> List[Tuple[Move, int, int]]:
+    # Root parallelism: one independent search per worker. Returns
+    # (move, wins for the player to move, rollouts) for each root child.
+    game_state, num_round, temperature, transposition_table_size, seed = jobinfo
+    random.seed(seed)
+    agent = MCTSAgent(num_round, temperature, transposition_table_size, False)
+    root = agent.start_search(game_state)
+    for _ in range(num_round):
+        path = agent.select_path(root)
+        winner = agent.simulate_random_game(path[-1].game_state)
+        agent.backpropagate(path, winner)
+    player = game_state.next_player
+    return [
+        (move, child.win_counts[player], child.num_rollouts)
+        for move, child in zip(root.child_moves, root.children)
+    ]
+
+
+def simulate(jobinfo) -> Player:
+    # Leaf parallelism: one rollout per job
+    agent_class, game_state = jobinfo
+    return agent_class.simulate_random_game(game_state)
+
+
+class ParallelMCTSAgent(MCTSAgent):
+    """MCTS agent that spreads its rollouts over a pool of worker processes.
+
+    With parallelism="root", every worker searches its own tree from the
+    current position with an equal share of the rounds, and the root
+    children statistics of all trees are summed before picking a move.
+
+    With parallelism="leaf", there is a single tree in this process.
+    Leaves are selected in batches, each path getting a virtual loss so
+    that the following selections in the batch go elsewhere, and the
+    rollouts of a batch run in the pool.
+
+    The pool is kept between moves. Use the agent in a with block, or
+    call close(), to shut it down.
+    """
+
+    def __init__(
+        self,
+        num_round: int,
+        temperature: float,
+        parallelism: str = ROOT_PARALLEL,
+        num_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        transposition_table_size: Optional[int] = None,
+    ) -> None:
+        if parallelism not in (ROOT_PARALLEL, LEAF_PARALLEL):
+            raise ValueError(
+                f"{parallelism} is not a valid parallelism, choose from 'root' or 'leaf'"
+            )
+        # Root parallel trees live in the workers and can't be reused
+        MCTSAgent.__init__(
+            self,
+            num_round,
+            temperature,
+            transposition_table_size,
+            reuse_tree=parallelism == LEAF_PARALLEL,
+        )
+        self.parallelism = parallelism
+        self.transposition_table_size = transposition_table_size
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size or self.num_workers
+        self._pool = None
+        self._finalizer: Optional[weakref.finalize] = None
+
+    # The pool is started by the first search and lives until close(),
+    # the end of a with block, or until the agent is garbage collected
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                processes=self.num_workers, initializer=seed_worker
+            )
+            self._finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._finalizer.detach()
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "ParallelMCTSAgent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def select_move(self, game_state: GameState) -> Move:
+        if self.parallelism == ROOT_PARALLEL:
+            return self._select_move_root_parallel(game_state)
+        return self._select_move_leaf_parallel(game_state)
+
+    def _select_move_root_parallel(self, game_state: GameState) -> Move:
+        # Only the superko history is sent along, not every earlier state
+        state = game_state.detached()
+        rounds, extra = divmod(self.num_round, self.num_workers)
+        jobs = [
+            (
+                state,
+                rounds + (1 if worker < extra else 0),
+                self.temperature,
+                self.transposition_table_size,
+                random.getrandbits(32),
+            )
+            for worker in range(self.num_workers)
+        ]
+        totals: Dict[Tuple, List[int]] = {}
+        for stats in self._get_pool().map(search_tree, jobs):
+            for move, wins, rollouts in stats:
+                key = (move.point, move.is_pass, move.is_resign)
+                entry = totals.setdefault(key, [0, 0])
+                entry[0] += wins
+                entry[1] += rollouts
+
+        best_key = None
+        best_pct = -1.0
+        for key, (wins, rollouts) in totals.items():
+            if rollouts and wins / rollouts > best_pct:
+                best_pct = wins / rollouts
+                best_key = key
+        if best_key is None:
+            return None
+        # The moves came back from the workers as copies; callers
+        # compare moves by identity, so return the interned one
+        point, is_pass, is_resign = best_key
+        if is_pass:
+            return Move.pass_turn()
+        if is_resign:
+            return Move.resign()
+        return Move.play(point)
+
+    def _select_move_leaf_parallel(self, game_state: GameState) -> Move:
+        root = self.start_search(game_state)
+        pool = self._get_pool()
+        num_done = 0
+        while num_done < self.num_round:
+            batch: List[List[MCTSNode]] = []
+            for _ in range(min(self.batch_size, self.num_round - num_done)):
+                path = self.select_path(root)
+                for node in path:
+                    node.add_virtual_loss()
+                batch.append(path)
+            jobs = [(type(self), path[-1].game_state.detached()) for path in batch]
+            winners = pool.map(simulate, jobs)
+            for path, winner in zip(batch, winners):
+                for node in path:
+                    node.revert_virtual_loss()
+                self.backpropagate(path, winner)
+            num_done += len(batch)
+        return self.best_move(root)
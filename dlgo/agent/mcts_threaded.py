@@ -0,0 +1,205 @@
+import math
+import random
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from dlgo.agent.mcts import MCTSAgent
+from dlgo.goboard_fast import GameState, Move
+from dlgo.gotypes import Player
+
+# Columns of the statistics table
+BLACK_WINS = 0
+WHITE_WINS = 1
+ROLLOUTS = 2
+VIRTUAL_LOSSES = 3
+
+_WIN_COLUMN = {Player.black: BLACK_WINS, Player.white: WHITE_WINS}
+
+
+class SharedStatistics:
+    # Win, rollout and virtual loss counts of every node of a shared tree,
+    # one row per node in a preallocated array. Each row is guarded by one
+    # of num_stripes locks (row % num_stripes), so threads only wait for
+    # each other when they update rows of the same stripe.
+    def __init__(self, max_nodes: int, num_stripes: int = 64) -> None:
+        self.counts = np.zeros((max_nodes, 4), dtype=np.int64)
+        self.locks = [threading.Lock() for _ in range(num_stripes)]
+        self._num_nodes = 0
+        self._allocation_lock = threading.Lock()
+
+    # Returns the row for a new node, or None once the table is full
+    def allocate(self) -> Optional[int]:
+        with self._allocation_lock:
+            if self._num_nodes == len(self.counts):
+                return None
+            row = self._num_nodes
+            self._num_nodes += 1
+        return row
+
+    def __len__(self) -> int:
+        return self._num_nodes
+
+    def add_virtual_loss(self, row: int) -> None:
+        with self.locks[row % len(self.locks)]:
+            self.counts[row, VIRTUAL_LOSSES] += 1
+
+    def record_win(self, row: int, winner: Player) -> None:
+        counts = self.counts[row]
+        with self.locks[row % len(self.locks)]:
+            counts[_WIN_COLUMN[winner]] += 1
+            counts[ROLLOUTS] += 1
+            counts[VIRTUAL_LOSSES] -= 1
+
+
+class ThreadedMCTSNode:
+    # A node of the shared tree. Its statistics live in SharedStatistics;
+    # the node itself only holds the tree structure, which changes under
+    # the node's lock when it is expanded.
+    __slots__ = (
+        "game_state",
+        "row",
+        "children",
+        "child_moves",
+        "unvisited_moves",
+        "lock",
+    )
+
+    def __init__(self, game_state: GameState, row: int) -> None:
+        self.game_state = game_state
+        self.row = row
+        self.children: List[ThreadedMCTSNode] = []
+        self.child_moves: List[Move] = []
+        self.unvisited_moves = game_state.legal_moves()
+        self.lock = threading.Lock()
+
+
+class ThreadedMCTSAgent(MCTSAgent):
+    """MCTS agent whose worker threads all search one shared tree.
+
+    Every thread descends the tree, adds a virtual loss to each node on
+    its path so that other threads are steered elsewhere, plays out a
+    rollout and backs up the result. Statistics are only locked per
+    stripe and expansion only per node, so threads scale with the work
+    that runs outside the GIL: on free-threaded builds, or with rollouts
+    that release it (e.g. NumPy-vectorized playouts).
+    """
+
+    def __init__(
+        self,
+        num_round: int,
+        temperature: float,
+        num_threads: int = 4,
+        max_nodes: int = 100_000,
+        num_stripes: int = 64,
+    ) -> None:
+        MCTSAgent.__init__(self, num_round, temperature, reuse_tree=False)
+        self.num_threads = num_threads
+        self.max_nodes = max_nodes
+        self.num_stripes = num_stripes
+
+    def select_move(self, game_state: GameState) -> Move:
+        stats = SharedStatistics(self.max_nodes, self.num_stripes)
+        root = ThreadedMCTSNode(game_state, stats.allocate())
+        remaining = [self.num_round]
+        remaining_lock = threading.Lock()
+
+        def work():
+            while True:
+                with remaining_lock:
+                    if remaining[0] == 0:
+                        return
+                    remaining[0] -= 1
+                self._run_round(root, stats)
+
+        threads = [threading.Thread(target=work) for _ in range(self.num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Select a move after completing MCTS rollouts
+        column = _WIN_COLUMN[game_state.next_player]
+        best_move = None
+        best_pct = -1.0
+        for move, child in zip(root.child_moves, root.children):
+            rollouts = stats.counts[child.row, ROLLOUTS]
+            if rollouts == 0:
+                continue
+            child_pct = stats.counts[child.row, column] / rollouts
+            if child_pct > best_pct:
+                best_pct = child_pct
+                best_move = move
+        return best_move
+
+    def _run_round(self, root: ThreadedMCTSNode, stats: SharedStatistics) -> None:
+        node = root
+        path = [root]
+        stats.add_virtual_loss(root.row)
+        while True:
+            child = self._expand(node, stats)
+            if child is not None:
+                path.append(child)
+                node = child
+                break
+            if not node.children or node.game_state.is_over():
+                break
+            node = self._select_child(node, stats)
+            stats.add_virtual_loss(node.row)
+            path.append(node)
+
+        # Simulates random game from this node
+        winner = self.simulate_random_game(node.game_state)
+
+        # Propagates the score back up the tree
+        for node in path:
+            stats.record_win(node.row, winner)
+
+    # Adds one unvisited move of node as a child and returns it with a
+    # virtual loss on it, or returns None if the node is fully expanded
+    @staticmethod
+    def _expand(
+        node: ThreadedMCTSNode, stats: SharedStatistics
+    ) -> Optional[ThreadedMCTSNode]:
+        with node.lock:
+            if not node.unvisited_moves:
+                return None
+            row = stats.allocate()
+            if row is None:
+                # Out of nodes: keep searching the tree as it is
+                node.unvisited_moves = []
+                return None
+            index = random.randint(0, len(node.unvisited_moves) - 1)
+            new_move = node.unvisited_moves[index]
+            node.unvisited_moves[index] = node.unvisited_moves[-1]
+            node.unvisited_moves.pop()
+        new_node = ThreadedMCTSNode(node.game_state.apply_move(new_move), row)
+        # Counted before other threads can see it, so it is never
+        # selected with zero visits
+        stats.add_virtual_loss(row)
+        with node.lock:
+            node.children.append(new_node)
+            node.child_moves.append(new_move)
+        return new_node
+
+    def _select_child(
+        self, node: ThreadedMCTSNode, stats: SharedStatistics
+    ) -> ThreadedMCTSNode:
+        # Reads are not locked: a count that is a rollout behind
+        # only nudges the UCT score
+        column = _WIN_COLUMN[node.game_state.next_player]
+        children = list(node.children)
+        counts = stats.counts[[child.row for child in children]]
+        visits = counts[:, ROLLOUTS] + counts[:, VIRTUAL_LOSSES]
+        total_rollouts = int(visits.sum())
+        best_score = -1.0
+        best_child = children[0]
+        for child, child_counts, child_visits in zip(children, counts, visits):
+            score = child_counts[column] / child_visits + self.temperature * math.sqrt(
+                math.log(total_rollouts) / child_visits
+            )
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
@@ -1,23 +1,14 @@
 import random
 
 from dlgo.agent.base import Agent
-from dlgo.agent.helpers import is_point_an_eye
-from dlgo.goboard_slow import Move
-from dlgo.gotypes import Point
+from dlgo.goboard_fast import Move
 
 
 # A random Go bot, playing at about 30 kyu strength
 class RandomBot(Agent):
     def select_move(self, game_state):
         """Choose a random valid move that preserves our own eyes."""
-        candidates = []
-        for r in range(1, game_state.board.num_rows + 1):
-            for c in range(1, game_state.board.num_cols + 1):
-                candidate = Point(row=r, col=c)
-                if game_state.is_valid_move(
-                    Move.play(candidate)
-                ) and not is_point_an_eye(
-                    game_state.board, candidate, game_state.next_player
-                ):
-                    candidates.append(candidate)
-        return Move.play(random.choice(candidates)) if candidates else Move.pass_turn()
+        candidates = [
+            move for move in game_state.legal_moves(exclude_eyes=True) if move.is_play
+        ]
+        return random.choice(candidates) if candidates else Move.pass_turn()
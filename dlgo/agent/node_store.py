@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from dlgo.goboard_fast import GameState, Move
+from dlgo.gotypes import Player, Point
+
+# Node index meaning "no node", e.g. the parent of the root
+NO_NODE = -1
+ROOT = 0
+
+# Move codes: plays are (row - 1) * num_cols + (col - 1), the same
+# layout as GameState.legal_move_mask; pass and resign are negative
+PASS = -1
+RESIGN = -2
+
+
+class NodeStore:
+    """Search tree kept as parallel NumPy arrays, one entry per node.
+
+    A node is an index into the arrays: its parent, the code of the move
+    that led to it, its first child and number of children, its visit
+    and win counts and its prior. The children of a node are allocated
+    together when it is expanded, so they occupy first_child[node] up to
+    first_child[node] + num_children[node]. Wins are counted for the
+    player who played the node's move, i.e. the one choosing it.
+
+    Nodes hold no game state. state() replays the moves from the nearest
+    node whose state is known, and keeps the results in a bounded LRU
+    cache, so a node costs 28 bytes however large the tree grows.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, state_cache_size: int = 4096) -> None:
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.move = np.zeros(capacity, dtype=np.int32)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int32)
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.wins = np.zeros(capacity, dtype=np.int32)
+        self.priors = np.zeros(capacity, dtype=np.float32)
+        self.num_nodes = 0
+        self.state_cache_size = state_cache_size
+        self._states: "OrderedDict[int, GameState]" = OrderedDict()
+        self._root_state: Optional[GameState] = None
+        self._num_cols = 0
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    @property
+    def capacity(self) -> int:
+        return len(self.parent)
+
+    # Empties the store and makes game_state the state of a new root
+    def reset(self, game_state: GameState) -> None:
+        self.num_nodes = 0
+        self._allocate(1)
+        self._root_state = game_state
+        self._num_cols = game_state.board.num_cols
+        self._states.clear()
+
+    @property
+    def root_player(self) -> Player:
+        return self._root_state.next_player
+
+    def is_expanded(self, node: int) -> bool:
+        return self.first_child[node] != NO_NODE
+
+    # Expanded nodes without children are the end of a game
+    def is_terminal(self, node: int) -> bool:
+        return self.is_expanded(node) and self.num_children[node] == 0
+
+    # Adds one child per move, in the given order, and returns the
+    # index of the first one
+    def expand(
+        self, node: int, moves: List[Move], priors: Optional[np.ndarray] = None
+    ) -> int:
+        first = self._allocate(len(moves))
+        end = first + len(moves)
+        self.parent[first:end] = node
+        self.move[first:end] = [self.encode_move(move) for move in moves]
+        if priors is not None:
+            self.priors[first:end] = priors
+        self.first_child[node] = first
+        self.num_children[node] = len(moves)
+        return first
+
+    def children(self, node: int) -> range:
+        first = self.first_child[node]
+        if first == NO_NODE:
+            return range(0)
+        return range(first, first + self.num_children[node])
+
+    # Counts a rollout won by winner for every node of the path from
+    # the root. Players alternate along the path: the root's move was
+    # made by the opponent of root_player, its children's by root_player.
+    def backpropagate(self, path: List[int], winner: Player) -> None:
+        nodes = np.asarray(path, dtype=np.intp)
+        self.visits[nodes] += 1
+        if winner == self.root_player:
+            self.wins[nodes[1::2]] += 1
+        else:
+            self.wins[nodes[0::2]] += 1
+
+    def state(self, node: int) -> GameState:
+        if node == ROOT:
+            return self._root_state
+        state = self._states.get(node)
+        if state is not None:
+            self._states.move_to_end(node)
+            return state
+        moves = []
+        while node != ROOT and node not in self._states:
+            moves.append(node)
+            node = int(self.parent[node])
+        state = self.state(node)
+        for child in reversed(moves):
+            state = state.apply_move(self.decode_move(int(self.move[child])))
+            self._cache_state(child, state)
+        return state
+
+    def encode_move(self, move: Move) -> int:
+        if move.is_pass:
+            return PASS
+        if move.is_resign:
+            return RESIGN
+        return (move.point.row - 1) * self._num_cols + move.point.col - 1
+
+    def decode_move(self, code: int) -> Move:
+        if code == PASS:
+            return Move.pass_turn()
+        if code == RESIGN:
+            return Move.resign()
+        row, col = divmod(code, self._num_cols)
+        return Move.play(Point(row + 1, col + 1))
+
+    def _cache_state(self, node: int, state: GameState) -> None:
+        self._states[node] = state
+        if len(self._states) > self.state_cache_size:
+            self._states.popitem(last=False)
+
+    # Returns the index of the first of count new nodes,
+    # doubling the arrays when they are full
+    def _allocate(self, count: int) -> int:
+        first = self.num_nodes
+        if first + count > self.capacity:
+            self._grow(max(2 * self.capacity, first + count))
+        end = first + count
+        self.parent[first:end] = NO_NODE
+        self.move[first:end] = 0
+        self.first_child[first:end] = NO_NODE
+        self.num_children[first:end] = 0
+        self.visits[first:end] = 0
+        self.wins[first:end] = 0
+        self.priors[first:end] = 0
+        self.num_nodes = end
+        return first
+
+    def _grow(self, capacity: int) -> None:
+        for name in (
+            "parent",
+            "move",
+            "first_child",
+            "num_children",
+            "visits",
+            "wins",
+            "priors",
+        ):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
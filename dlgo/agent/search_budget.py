@@ -0,0 +1,66 @@
+import time
+from typing import Optional
+
+
+class SearchBudget:
+    """How long one search may run: a number of rounds, a number of
+    seconds, or both, whichever runs out first.
+
+    Call start() before the first round and record_round() after each;
+    resources_left() then tells whether another round fits. The measured
+    rate is used to turn the time left into an estimate of the rounds
+    left, which is what early stopping needs.
+    """
+
+    def __init__(
+        self, max_rounds: Optional[int] = None, seconds: Optional[float] = None
+    ) -> None:
+        if max_rounds is None and seconds is None:
+            raise ValueError("A search budget needs max_rounds, seconds or both")
+        self.max_rounds = max_rounds
+        self.seconds = seconds
+        self.rounds = 0
+        self._start = 0.0
+        self._stop: Optional[float] = None
+
+    def start(self) -> None:
+        self.rounds = 0
+        self._start = time.perf_counter()
+        self._stop = None
+
+    def record_round(self) -> None:
+        self.rounds += 1
+
+    # Ends the search before the budget runs out
+    def stop(self) -> None:
+        self._stop = time.perf_counter()
+
+    def resources_left(self) -> bool:
+        if self._stop is not None:
+            return False
+        if self.max_rounds is not None and self.rounds >= self.max_rounds:
+            return False
+        if self.seconds is not None and self.elapsed >= self.seconds:
+            return False
+        return True
+
+    @property
+    def elapsed(self) -> float:
+        end = self._stop if self._stop is not None else time.perf_counter()
+        return end - self._start
+
+    @property
+    def rollouts_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rounds / elapsed if elapsed > 0 else 0.0
+
+    # Rounds still to come, estimated from the rate so far
+    # when time is the limit
+    def rounds_left(self) -> float:
+        left = float("inf")
+        if self.max_rounds is not None:
+            left = self.max_rounds - self.rounds
+        if self.seconds is not None and self.rounds:
+            time_left = max(self.seconds - self.elapsed, 0.0)
+            left = min(left, time_left * self.rollouts_per_second)
+        return left
@@ -0,0 +1,138 @@
+import glob
+import json
+
+import numpy as np
+
+from dlgo.data.storage import unpack_features
+
+__all__ = ["MemmapDataset", "chunk_sources", "write_dataset"]
+
+
+def _split_files(data_dir, name):
+    base = f"{data_dir}/{name}"
+    return f"{base}_features.npy", f"{base}_labels.npy", f"{base}_index.json"
+
+
+def chunk_sources(data_dir, data_type, samples):
+    """Finds the feature chunks GoDataProcessor saved for samples.
+
+    samples are (zip file name, game index) pairs as drawn by Sampler.
+    Returns the sources argument of write_dataset: the data file name of
+    every zip, e.g. "KGS-2004-19-12106-train", mapped to its chunks.
+    """
+    sources = {}
+    for zip_file_name in {file_name for file_name, index in samples}:
+        file_name = zip_file_name.replace(".tar.gz", "") + data_type
+        base = f"{data_dir}/{file_name}_features_*.npy"
+        sources[file_name] = sorted(glob.glob(base))
+    return sources
+
+
+def write_dataset(data_dir, name, sources, feature_shape):
+    """Joins the chunks of a split into one contiguous pair of files.
+
+    sources maps a source name, such as the data file of one KGS zip,
+    to the feature chunk files saved for it; label files are found by
+    replacing "features" with "labels", as in GoDataProcessor. Chunks
+    are copied one at a time into memory-mapped .npy files, so the split
+    never has to fit in memory. Features stay in their stored format:
+    bit-packed if every chunk is, int8 otherwise. The index written
+    next to them keeps the feature shape and the rows of every source.
+    """
+    feature_shape = tuple(int(size) for size in feature_shape)
+    chunks = []
+    for source, feature_files in sources.items():
+        for feature_file in feature_files:
+            label_file = feature_file.replace("features", "labels")
+            chunks.append((source, np.load(feature_file, mmap_mode="r"), label_file))
+    packed = bool(chunks) and all(x.dtype == np.uint8 for _, x, _ in chunks)
+    num_samples = sum(len(x) for _, x, _ in chunks)
+    if packed:
+        num_bytes = (int(np.prod(feature_shape)) + 7) // 8
+        row_shape, dtype = (num_bytes,), np.uint8
+    else:
+        row_shape, dtype = feature_shape, np.int8
+
+    feature_file, label_file, index_file = _split_files(data_dir, name)
+    features = np.lib.format.open_memmap(
+        feature_file, mode="w+", dtype=dtype, shape=(num_samples,) + row_shape
+    )
+    labels = np.lib.format.open_memmap(
+        label_file, mode="w+", dtype=np.int16, shape=(num_samples,)
+    )
+    rows = {}
+    start = 0
+    for source, x, chunk_label_file in chunks:
+        stop = start + len(x)
+        if not packed:
+            x = unpack_features(x, feature_shape, np.int8)
+        features[start:stop] = x
+        labels[start:stop] = np.load(chunk_label_file)
+        first, _ = rows.get(source, (start, stop))
+        rows[source] = (first, stop)
+        start = stop
+    features.flush()
+    labels.flush()
+    del features, labels
+
+    with open(index_file, "w") as index:
+        json.dump({"feature_shape": feature_shape, "sources": rows}, index)
+    return MemmapDataset(data_dir, name)
+
+
+class MemmapDataset:
+    """A split written by write_dataset, read through memory maps.
+
+    Nothing is loaded up front: a batch reads just its own rows, as a
+    view of consecutive rows or with one gather for shuffled batches,
+    and only the batch is unpacked to float32. Memory use stays the
+    same however large the split is. generate and get_num_samples work
+    like DataGenerator's, so either can be handed to fit_generator.
+    """
+
+    def __init__(self, data_dir, name):
+        feature_file, label_file, index_file = _split_files(data_dir, name)
+        with open(index_file) as index:
+            index = json.load(index)
+        self.feature_shape = tuple(index["feature_shape"])
+        # Rows [start, stop) of every source
+        self.sources = {
+            source: tuple(rows) for source, rows in index["sources"].items()
+        }
+        self.features = np.load(feature_file, mmap_mode="r")
+        self.labels = np.load(label_file, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.labels)
+
+    # Features and one-hot labels of the rows picked by a slice or by
+    # an array of row numbers
+    def batch(self, rows, num_classes=19 * 19):
+        x = unpack_features(self.features[rows], self.feature_shape)
+        labels = self.labels[rows]
+        y = np.zeros((len(labels), num_classes), dtype=np.float32)
+        y[np.arange(len(labels)), labels] = 1
+        return x, y
+
+    # One pass over the split in full batches. Shuffled batches are
+    # drawn from a fresh permutation, and each batch's rows are sorted
+    # so the gather reads the file front to back.
+    def batches(self, batch_size=128, num_classes=19 * 19, shuffle=False, rng=None):
+        num_batches = len(self) // batch_size
+        if not shuffle:
+            for start in range(0, num_batches * batch_size, batch_size):
+                yield self.batch(slice(start, start + batch_size), num_classes)
+            return
+        rng = rng if rng is not None else np.random.default_rng()
+        order = rng.permutation(len(self))
+        for start in range(0, num_batches * batch_size, batch_size):
+            rows = np.sort(order[start : start + batch_size])
+            yield self.batch(rows, num_classes)
+
+    def generate(self, batch_size=128, num_classes=19 * 19, shuffle=False, rng=None):
+        while True:
+            for item in self.batches(batch_size, num_classes, shuffle, rng):
+                yield item
+
+    def get_num_samples(self, batch_size=128, num_classes=19 * 19):
+        return len(self) // batch_size * batch_size
@@ -1,52 +1,30 @@
 # tag::data_generator[]
-import glob
-
-import numpy as np
-from keras.utils import to_categorical
+from dlgo.data.dataset import chunk_sources, write_dataset
 
 
 class DataGenerator:
-    def __init__(self, data_directory, samples):
+    # A thin wrapper over MemmapDataset: the chunks of the sampled games
+    # are joined into one memory-mapped split when the generator is made,
+    # and batches are then read from that split
+    def __init__(self, data_directory, samples, feature_shape, data_type="train"):
         self.data_directory = data_directory
         self.samples = samples
         self.files = {file_name for file_name, index in samples}
-        self.num_samples = None
+        sources = chunk_sources(data_directory, data_type, samples)
+        self.dataset = write_dataset(data_directory, data_type, sources, feature_shape)
 
     def get_num_samples(self, batch_size=128, num_classes=19 * 19):  # <2>
-        if self.num_samples is None:
-            self.num_samples = 0
-            for X, y in self._generate(batch_size=batch_size, num_classes=num_classes):
-                self.num_samples += X.shape[0]
-        return self.num_samples
+        return self.dataset.get_num_samples(batch_size, num_classes)
 
     # <1> Our generator has access to a set of files that we sampled earlier.
     # <2> Depending on the application, we may need to know how many examples we have.
     # end::data_generator[]
 
-    # tag::private_generate[]
-    def _generate(self, batch_size, num_classes):
-        for zip_file_name in self.files:
-            file_name = zip_file_name.replace(".tar.gz", "") + "train"
-            base = f"{self.data_directory}/{file_name}_features_*.npy"
-            for feature_file in glob.glob(base):
-                label_file = feature_file.replace("features", "labels")
-                x = np.load(feature_file)
-                y = np.load(label_file)
-                x = x.astype("float32")
-                y = to_categorical(y.astype(int), num_classes)
-                while x.shape[0] >= batch_size:
-                    x_batch, x = x[:batch_size], x[batch_size:]
-                    y_batch, y = y[:batch_size], y[batch_size:]
-                    yield x_batch, y_batch  # <1>
-
-    # <1> We return or "yield" batches of data as we go.
-    # end::private_generate[]
-
     # tag::generate[]
     def generate(self, batch_size=128, num_classes=19 * 19):
-        while True:
-            for item in self._generate(batch_size, num_classes):
-                yield item
+        return self.dataset.generate(batch_size, num_classes)  # <1>
+
+    # <1> We return or "yield" batches of data as we go, reading only one batch at a time from disk.
 
 
 # end::generate[]
@@ -1,6 +1,5 @@
 from __future__ import absolute_import
 
-import glob
 import gzip
 
 # tag::base_imports[]
@@ -9,12 +8,13 @@ import shutil
 import tarfile
 
 import numpy as np
-from keras.utils import to_categorical
 
+from dlgo.data.dataset import chunk_sources, write_dataset
 from dlgo.data.index_processor import KGSIndex
 from dlgo.data.sampling import Sampler  # <1>
+from dlgo.data.storage import save_features
 from dlgo.encoders.base import get_encoder_by_name
-from dlgo.goboard import Board, GameState, Move
+from dlgo.goboard_fast import Board, GameState, Move
 
 # tag::dlgo_imports[]
 from dlgo.gosgf import Sgf_game
@@ -36,7 +36,9 @@ class GoDataProcessor:
     # end::processor_init[]
 
     # tag::load_go_data[]
-    def load_go_data(self, data_type="train", num_samples=1000):  # <1>  # <2>
+    def load_go_data(
+        self, data_type="train", num_samples=1000, use_generator=False
+    ):  # <1>  # <2>
         index = KGSIndex(data_directory=self.data_dir)
         index.download_files()  # <3>
 
@@ -58,7 +60,9 @@ class GoDataProcessor:
                     zip_name, data_file_name, indices_by_zip_name[zip_name]
                 )  # <7>
 
-        features_and_labels = self.consolidate_games(data_type, data)  # <8>
+        if use_generator:
+            return self.build_dataset(data_type, data)  # <8>
+        features_and_labels = self.consolidate_games(data_type, data)  # <9>
         return features_and_labels
 
     # <1> As `data_type` you can choose either 'train' or 'test'.
@@ -68,7 +72,8 @@ class GoDataProcessor:
     # <5> We collect all zip file names contained in the data in a list.
     # <6> Then we group all SGF file indices by zip file name.
     # <7> The zip files are then processed individually.
-    # <8> Features and labels from each zip are then aggregated and returned.
+    # <8> With use_generator, a memory-mapped data set is returned that generates batches from disk...
+    # <9> ... otherwise features and labels from each zip are aggregated and returned.
     # end::load_go_data[]
 
     # tag::unzip_data[]
@@ -96,8 +101,8 @@ class GoDataProcessor:
 
         shape = self.encoder.shape()  # <2>
         feature_shape = np.insert(shape, 0, np.asarray([total_examples]))
-        features = np.zeros(feature_shape)
-        labels = np.zeros((total_examples,))
+        features = np.zeros(feature_shape, dtype=np.int8)
+        labels = np.zeros((total_examples,), dtype=np.int16)
 
         counter = 0
         for index in game_list:
@@ -108,6 +113,7 @@ class GoDataProcessor:
             sgf = Sgf_game.from_string(sgf_content)  # <3>
 
             game_state, first_move_done = self.get_handicap(sgf)  # <4>
+            game_states = []
 
             for item in sgf.main_sequence_iter():  # <5>
                 color, move_tuple = item.get_move()
@@ -120,11 +126,14 @@ class GoDataProcessor:
                     else:
                         move = Move.pass_turn()  # <7>
                     if first_move_done and point is not None:
-                        features[counter] = self.encoder.encode(game_state)  # <8>
+                        game_states.append(game_state)  # <8>
                         labels[counter] = self.encoder.encode_point(point)  # <9>
                         counter += 1
                     game_state = game_state.apply_move(move)  # <10>
                     first_move_done = True
+            self.encoder.encode_batch(
+                game_states, features[counter - len(game_states) : counter]
+            )  # <11>
         # <1> Determine the total number of moves in all games in this zip file.
         # <2> Infer the shape of features and labels from the encoder we use.
         # <3> Read the SGF content as string, after extracting the zip file.
@@ -132,9 +141,10 @@ class GoDataProcessor:
         # <5> Iterate over all moves in the SGF file.
         # <6> Read the coordinates of the stone to be played...
         # <7> ... or pass, if there is none.
-        # <8> We encode the current game state as features...
+        # <8> We collect the current game state to be encoded as features...
         # <9> ... and the next move as label for the features.
         # <10> Afterwards the move is applied to the board and we proceed with the next one.
+        # <11> All positions of a game are encoded at once, straight into their rows of features.
         # end::read_sgf_files[]
 
         # tag::store_features_and_labels[]
@@ -149,42 +159,29 @@ class GoDataProcessor:
             chunk += 1
             current_features, features = features[:chunksize], features[chunksize:]
             current_labels, labels = labels[:chunksize], labels[chunksize:]  # <2>
-            np.save(feature_file, current_features)
+            save_features(feature_file, current_features, self.encoder.binary())
             np.save(label_file, current_labels)  # <3>
 
     # <1> We process features and labels in chunks of size 1024.
     # <2> The current chunk is cut off from features and labels...
-    # <3> ...  and then stored in a separate file.
+    # <3> ...  and then stored in a separate file. Features are bit-packed if the encoder's values are all 0 or 1, int8 otherwise; labels are int16 move indices.
     # end::store_features_and_labels[]
 
     # tag::consolidate_games[]
     def consolidate_games(self, data_type, samples):
-        files_needed = set(file_name for file_name, index in samples)
-        file_names = []
-        for zip_file_name in files_needed:
-            file_name = zip_file_name.replace(".tar.gz", "") + data_type
-            file_names.append(file_name)
-
-        feature_list = []
-        label_list = []
-        for file_name in file_names:
-            file_prefix = file_name.replace(".tar.gz", "")
-            base = self.data_dir + "/" + file_prefix + "_features_*.npy"
-            for feature_file in glob.glob(base):
-                label_file = feature_file.replace("features", "labels")
-                x = np.load(feature_file)
-                y = np.load(label_file)
-                x = x.astype("float32")
-                y = to_categorical(y.astype(int), 19 * 19)
-                feature_list.append(x)
-                label_list.append(y)
-        features = np.concatenate(feature_list, axis=0)
-        labels = np.concatenate(label_list, axis=0)
-        np.save("{}/features_{}.npy".format(self.data_dir, data_type), features)
-        np.save("{}/labels_{}.npy".format(self.data_dir, data_type), labels)
-
+        dataset = self.build_dataset(data_type, samples)  # <1>
+        features, labels = dataset.batch(slice(None))  # <2>
         return features, labels
 
+    def build_dataset(self, data_type, samples):
+        sources = chunk_sources(self.data_dir, data_type, samples)
+        return write_dataset(
+            self.data_dir, data_type, sources, self.encoder.shape()
+        )  # <3>
+
+    # <1> All chunks of this data type are joined into one memory-mapped data set on disk...
+    # <2> ... which is then read in one go. Load large data sets with use_generator=True to read them batch by batch instead.
+    # <3> The chunks are copied one at a time, so the data set never has to fit in memory.
     # end::consolidate_games[]
 
     # tag::get_handicap[]
@@ -192,15 +189,14 @@ class GoDataProcessor:
     def get_handicap(sgf):
         go_board = Board(19, 19)
         first_move_done = False
-        move = None
         game_state = GameState.new_game(19)
         if sgf.get_handicap() is not None and sgf.get_handicap() != 0:
             for setup in sgf.get_root().get_setup_stones():
-                for move in setup:
-                    row, col = move
+                for row, col in setup:
                     go_board.place_stone(Player.black, Point(row + 1, col + 1))
             first_move_done = True
-            game_state = GameState(go_board, Player.white, None, move)
+            # Setup stones are not moves, so there is no last move
+            game_state = GameState(go_board, Player.white, None, None)
         return game_state, first_move_done
 
     # end::get_handicap[]
@@ -1,6 +1,5 @@
 from __future__ import absolute_import, print_function
 
-import glob
 import gzip
 import multiprocessing
 import os
@@ -10,13 +9,13 @@ import tarfile
 from os import sys
 
 import numpy as np
-from keras.utils import to_categorical
 
-from dlgo.data.generator import DataGenerator
+from dlgo.data.dataset import chunk_sources, write_dataset
 from dlgo.data.index_processor import KGSIndex
 from dlgo.data.sampling import Sampler
+from dlgo.data.storage import save_features
 from dlgo.encoders.base import get_encoder_by_name
-from dlgo.goboard import Board, GameState, Move
+from dlgo.goboard_fast import Board, GameState, Move
 from dlgo.gosgf.sgf import Sgf_game
 from dlgo.gotypes import Player, Point
 
@@ -45,12 +44,12 @@ class GoDataProcessor:
 
         self.map_to_workers(data_type, data)  # <1>
         if use_generator:
-            return DataGenerator(self.data_dir, data)
+            return self.build_dataset(data_type, data)  # <2>
         else:
-            return self.consolidate_games(data_type, data)
+            return self.consolidate_games(data_type, data)  # <3>
 
     # <1> Map workload to CPUs
-    # <2> Either return a Go data generator...
+    # <2> Either return a memory-mapped data set that generates batches from disk...
     # <3> ... or return consolidated data as before.
     # end::load_generator[]
 
@@ -70,8 +69,8 @@ class GoDataProcessor:
 
         shape = self.encoder.shape()
         feature_shape = np.insert(shape, 0, np.asarray([total_examples]))
-        features = np.zeros(feature_shape)
-        labels = np.zeros((total_examples,))
+        features = np.zeros(feature_shape, dtype=np.int8)
+        labels = np.zeros((total_examples,), dtype=np.int16)
 
         counter = 0
         for index in game_list:
@@ -82,6 +81,7 @@ class GoDataProcessor:
             sgf = Sgf_game.from_string(sgf_content)
 
             game_state, first_move_done = self.get_handicap(sgf)
+            game_states = []
 
             for item in sgf.main_sequence_iter():
                 color, move_tuple = item.get_move()
@@ -94,11 +94,14 @@ class GoDataProcessor:
                     else:
                         move = Move.pass_turn()
                     if first_move_done and point is not None:
-                        features[counter] = self.encoder.encode(game_state)
+                        game_states.append(game_state)
                         labels[counter] = self.encoder.encode_point(point)
                         counter += 1
                     game_state = game_state.apply_move(move)
                     first_move_done = True
+            self.encoder.encode_batch(
+                game_states, features[counter - len(game_states) : counter]
+            )
 
         feature_file_base = f"{self.data_dir}/{data_file_name}_features_%d"
         label_file_base = f"{self.data_dir}/{data_file_name}_labels_%d"
@@ -111,56 +114,32 @@ class GoDataProcessor:
             chunk += 1
             current_features, features = features[:chunksize], features[chunksize:]
             current_labels, labels = labels[:chunksize], labels[chunksize:]
-            np.save(feature_file, current_features)
+            save_features(feature_file, current_features, self.encoder.binary())
             np.save(label_file, current_labels)
 
     def consolidate_games(self, name, samples):
-        files_needed = {file_name for file_name, index in samples}
-        file_names = []
-        for zip_file_name in files_needed:
-            file_name = zip_file_name.replace(".tar.gz", "") + name
-            file_names.append(file_name)
-
-        feature_list = []
-        label_list = []
-        for file_name in file_names:
-            file_prefix = file_name.replace(".tar.gz", "")
-            base = f"{self.data_dir}/{file_prefix}_features_*.npy"
-            for feature_file in glob.glob(base):
-                label_file = feature_file.replace("features", "labels")
-                x = np.load(feature_file)
-                y = np.load(label_file)
-                x = x.astype("float32")
-                y = to_categorical(y.astype(int), 19 * 19)
-                feature_list.append(x)
-                label_list.append(y)
-
-        features = np.concatenate(feature_list, axis=0)
-        labels = np.concatenate(label_list, axis=0)
-
-        feature_file = f"{self.data_dir}/{name}"
-        label_file = f"{self.data_dir}/{name}"
-
-        np.save(feature_file, features)
-        np.save(label_file, labels)
-
-        return features, labels
+        dataset = self.build_dataset(name, samples)
+        return dataset.batch(slice(None))
+
+    # Joins the chunks of all samples into one memory-mapped data set
+    def build_dataset(self, name, samples):
+        sources = chunk_sources(self.data_dir, name, samples)
+        return write_dataset(self.data_dir, name, sources, self.encoder.shape())
 
     @staticmethod
     def get_handicap(sgf):  # Get handicap stones
         go_board = Board(19, 19)
         first_move_done = False
-        move = None
         game_state = GameState.new_game(19)
         if sgf.get_handicap() is not None and sgf.get_handicap() != 0:
             for setup in sgf.get_root().get_setup_stones():
-                for move in setup:
-                    row, col = move
+                for row, col in setup:
                     go_board.place_stone(
                         Player.black, Point(row + 1, col + 1)
                     )  # black gets handicap
             first_move_done = True
-            game_state = GameState(go_board, Player.white, None, move)
+            # Setup stones are not moves, so there is no last move
+            game_state = GameState(go_board, Player.white, None, None)
         return game_state, first_move_done
 
     def map_to_workers(self, data_type, samples):
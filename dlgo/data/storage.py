@@ -0,0 +1,39 @@
+import numpy as np
+
+__all__ = ["load_features", "pack_features", "save_features", "unpack_features"]
+
+
+# Encoded features are small integers, so processed data is stored
+# compactly: bit-packed for encoders whose values are all 0 or 1 (see
+# Encoder.binary), as int8 otherwise. The format is the caller's choice
+# rather than guessed from the values, so every chunk of a data set is
+# stored the same way. Packed features are one row of uint8 per sample,
+# so they can only be unpacked by someone who knows the encoder's shape.
+def pack_features(features, packed):
+    features = np.asarray(features)
+    if not packed:
+        return features.astype(np.int8)
+    if not ((features == 0) | (features == 1)).all():
+        raise ValueError("Only features of 0 and 1 can be bit-packed")
+    bits = features.reshape(len(features), -1).astype(bool)
+    return np.packbits(bits, axis=1)
+
+
+# Turns stored features back into (samples, planes, height, width)
+# arrays of dtype. Chunks saved as float64 before packing load too.
+def unpack_features(stored, sample_shape=None, dtype=np.float32):
+    if stored.dtype != np.uint8:
+        return stored.astype(dtype)
+    if sample_shape is None:
+        raise ValueError("Bit-packed features need the encoder's shape to unpack")
+    sample_shape = tuple(sample_shape)
+    bits = np.unpackbits(stored, axis=1, count=int(np.prod(sample_shape)))
+    return bits.reshape((len(stored),) + sample_shape).astype(dtype)
+
+
+def save_features(file_name, features, packed):
+    np.save(file_name, pack_features(features, packed))
+
+
+def load_features(file_name, sample_shape=None, dtype=np.float32):
+    return unpack_features(np.load(file_name), sample_shape, dtype)
@@ -1,6 +1,8 @@
 # tag::importlib[]
 import importlib
 
+import numpy as np
+
 # end::importlib[]
 
 __all__ = [
@@ -29,6 +31,19 @@ class Encoder:
     def shape(self):  # <6>
         raise NotImplementedError()
 
+    def encode_into(self, game_state, out):  # <7>
+        out[...] = self.encode(game_state)
+
+    def encode_batch(self, game_states, out=None):  # <8>
+        if out is None:
+            out = np.zeros((len(game_states),) + tuple(self.shape()), dtype=np.float32)
+        for game_state, sample in zip(game_states, out):
+            self.encode_into(game_state, sample)
+        return out
+
+    def binary(self):  # <9>
+        return False
+
 
 # <1> Lets us support logging or saving the name of the encoder our model is using.
 # <2> Turn a Go board into a numeric data.
@@ -36,6 +51,9 @@ class Encoder:
 # <4> Turn an integer index back into a Go board point.
 # <5> Number of points on the board, i.e. board width times board height.
 # <6> Shape of the encoded board structure.
+# <7> Encode into an existing array of the encoder's shape. Encoders override this to write in place instead of allocating.
+# <8> Encode many game states into one (batch, planes, height, width) array, by default float32. Pass out to fill a preallocated buffer, e.g. a slice of a dataset.
+# <9> Whether every encoded value is 0 or 1, so that processed features can be stored bit-packed.
 # end::base_encoder[]
 
 
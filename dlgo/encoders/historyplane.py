@@ -0,0 +1,69 @@
+# tag::historyplane_imports[]
+import numpy as np
+
+from dlgo.encoders.sevenplane import SevenPlaneEncoder
+
+# end::historyplane_imports[]
+
+# Number of turns-since planes. Stones played this many moves ago or
+# earlier share the last one.
+HISTORY_LENGTH = 8
+
+_AGES = np.arange(1, HISTORY_LENGTH + 1).reshape(HISTORY_LENGTH, 1, 1)
+
+
+# tag::historyplane_encoder[]
+class HistoryPlaneEncoder(SevenPlaneEncoder):
+    def __init__(self, board_size):
+        SevenPlaneEncoder.__init__(self, board_size)
+        self.num_planes = 7 + HISTORY_LENGTH
+
+    def name(self):
+        return "historyplane"
+
+    def encode_into(self, game_state, out):
+        SevenPlaneEncoder.encode_into(self, game_state, out[:7])  # <1>
+        ages = np.empty(self.shape()[1:], dtype=np.int8)
+        self._stone_ages(game_state, ages)
+        out[7:] = ages == _AGES  # <2>
+
+    def encode_batch(self, game_states, out=None):
+        if out is None:
+            out = np.empty((len(game_states),) + self.shape(), dtype=np.float32)
+        SevenPlaneEncoder.encode_batch(self, game_states, out[:, :7])
+        ages = np.empty((len(game_states),) + self.shape()[1:], dtype=np.int8)
+        for game_state, state_ages in zip(game_states, ages):
+            self._stone_ages(game_state, state_ages)
+        np.equal(ages[:, np.newaxis], _AGES, out=out[:, 7:])
+        return out
+
+    # Writes into ages how many moves ago each stone was played, 1 for
+    # the last move, HISTORY_LENGTH for stones that old or older and 0
+    # for empty points
+    @staticmethod
+    def _stone_ages(game_state, ages):
+        np.multiply(game_state.board.stone_array() != 0, HISTORY_LENGTH, out=ages)
+        state = game_state
+        for age in range(1, HISTORY_LENGTH):  # <3>
+            if state is None or state.last_move is None:
+                break
+            move = state.last_move
+            if move.is_play:
+                row, col = move.point.row - 1, move.point.col - 1
+                if ages[row, col] == HISTORY_LENGTH:  # <4>
+                    ages[row, col] = age
+            state = state.previous_state
+
+    # <1> The first seven planes are those of the sevenplane encoder.
+    # <2> Plane 7 + k marks the stones played k + 1 moves ago, and the last plane every older stone.
+    # <3> Only the last moves are looked up, by following previous_state, so a position costs the same however long the game is. Detached states know only their last move, and their older stones go to the last plane.
+    # <4> A point played again after a capture keeps the age of its latest stone, which is the first one found.
+    # end::historyplane_encoder[]
+
+
+# tag::historyplane_create[]
+def create(board_size):
+    return HistoryPlaneEncoder(board_size)
+
+
+# end::historyplane_create[]
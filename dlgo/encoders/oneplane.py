@@ -2,7 +2,7 @@
 import numpy as np
 
 from dlgo.encoders.base import Encoder
-from dlgo.goboard import Point
+from dlgo.goboard_fast import Point
 
 # end::oneplane_imports[]
 
@@ -17,22 +17,32 @@ class OnePlaneEncoder(Encoder):
         return "oneplane"
 
     def encode(self, game_state):  # <2>
-        board_matrix = np.zeros(self.shape())
-        next_player = game_state.next_player
-        for r in range(self.board_height):
-            for c in range(self.board_width):
-                p = Point(row=r + 1, col=c + 1)
-                go_string = game_state.board.get_go_string(p)
-                if go_string is None:
-                    continue
-                if go_string.color == next_player:
-                    board_matrix[0, r, c] = 1
-                else:
-                    board_matrix[0, r, c] = -1
+        board_matrix = np.zeros(self.shape(), dtype=np.float32)
+        self.encode_into(game_state, board_matrix)
         return board_matrix
 
+    def encode_into(self, game_state, out):
+        stones = game_state.board.stone_array()
+        next_player = game_state.next_player
+        out[0] = stones == next_player.value
+        out[0][stones == next_player.other.value] = -1
+
+    def encode_batch(self, game_states, out=None):  # <3>
+        if out is None:
+            out = np.empty((len(game_states),) + self.shape(), dtype=np.float32)
+        stones = np.empty((len(game_states),) + self.shape()[1:], dtype=np.int8)
+        players = np.empty((len(game_states), 1, 1), dtype=np.int8)
+        for i, game_state in enumerate(game_states):
+            stones[i] = game_state.board.stone_array()
+            players[i] = game_state.next_player.value
+        own = stones == players
+        out[:, 0] = own
+        out[:, 0][(stones != 0) & ~own] = -1
+        return out
+
     # <1> We can reference this encoder by the name "oneplane".
     # <2> To encode, we fill a matrix with 1 if the point contains one of the current player's stones, -1 if the point contains the opponent's stones and 0 if the point is empty.
+    # <3> A batch gathers the stone arrays of all states and then encodes them together.
     # end::oneplane_encoder[]
 
     # tag::oneplane_encoder_2[]
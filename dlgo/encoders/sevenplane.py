@@ -0,0 +1,96 @@
+# tag::sevenplane_imports[]
+import numpy as np
+
+from dlgo.encoders.base import Encoder
+from dlgo.goboard_fast import Point
+
+# end::sevenplane_imports[]
+
+
+# tag::sevenplane_encoder[]
+class SevenPlaneEncoder(Encoder):
+    def __init__(self, board_size):
+        self.board_width, self.board_height = board_size
+        self.num_planes = 7
+
+    def name(self):
+        return "sevenplane"
+
+    def encode(self, game_state):
+        board_tensor = np.zeros(self.shape(), dtype=np.float32)
+        self.encode_into(game_state, board_tensor)
+        return board_tensor
+
+    def encode_into(self, game_state, out):
+        board = game_state.board
+        stones = board.stone_array()
+        liberties = np.minimum(board.liberty_array(), 3)  # <1>
+        own = stones == game_state.next_player.value
+        other = stones == game_state.next_player.other.value
+        for num_liberties in range(1, 4):
+            has_liberties = liberties == num_liberties
+            out[num_liberties - 1] = own & has_liberties  # <2>
+            out[num_liberties + 2] = other & has_liberties  # <3>
+        out[6] = 0
+        ko_point = game_state.ko_point
+        if ko_point is not None:
+            out[6, ko_point.row - 1, ko_point.col - 1] = 1  # <4>
+
+    def encode_batch(self, game_states, out=None):  # <5>
+        num_states = len(game_states)
+        if out is None:
+            out = np.empty((num_states,) + self.shape(), dtype=np.float32)
+        stones = np.empty((num_states,) + self.shape()[1:], dtype=np.int8)
+        liberties = np.empty_like(stones)
+        players = np.empty((num_states, 1, 1), dtype=np.int8)
+        ko_states, ko_rows, ko_cols = [], [], []
+        for i, game_state in enumerate(game_states):
+            board = game_state.board
+            stones[i] = board.stone_array()
+            np.minimum(board.liberty_array(), 3, out=liberties[i])
+            players[i] = game_state.next_player.value
+            ko_point = game_state.ko_point
+            if ko_point is not None:
+                ko_states.append(i)
+                ko_rows.append(ko_point.row - 1)
+                ko_cols.append(ko_point.col - 1)
+        own = stones == players
+        other = (stones != 0) & ~own
+        has_liberties = liberties[:, np.newaxis] == np.arange(1, 4).reshape(3, 1, 1)
+        np.logical_and(own[:, np.newaxis], has_liberties, out=out[:, 0:3])
+        np.logical_and(other[:, np.newaxis], has_liberties, out=out[:, 3:6])
+        out[:, 6] = 0
+        out[ko_states, 6, ko_rows, ko_cols] = 1
+        return out
+
+    # <1> Liberty counts are kept up to date by the board itself, so no strings are traced here. Strings with three or more liberties share a plane.
+    # <2> Planes 0 to 2 hold the stones of the player to move with one, two and three or more liberties...
+    # <3> ... and planes 3 to 5 the opponent's stones.
+    # <4> The last plane marks the point the player to move may not take back because of ko.
+    # <5> A batch gathers the stones, liberty counts and ko points of all states and then builds every plane of every state at once.
+    # end::sevenplane_encoder[]
+
+    def encode_point(self, point):
+        return self.board_width * (point.row - 1) + (point.col - 1)
+
+    def decode_point_index(self, index):
+        row = index // self.board_width
+        col = index % self.board_width
+        return Point(row=row + 1, col=col + 1)
+
+    def num_points(self):
+        return self.board_width * self.board_height
+
+    def shape(self):
+        return self.num_planes, self.board_height, self.board_width
+
+    def binary(self):
+        return True
+
+
+# tag::sevenplane_create[]
+def create(board_size):
+    return SevenPlaneEncoder(board_size)
+
+
+# end::sevenplane_create[]
@@ -84,6 +84,7 @@ class Board:
         # TODO: write types
         self._grid = {}
         self._hash = zobrist.EMPTY_BOARD
+        self._zobrist = zobrist.get_table(num_rows, num_cols)
 
     def is_on_grid(self, point: Point) -> bool:
         return 1 <= point.row <= self.num_rows and 1 <= point.col <= self.num_cols
@@ -114,7 +115,9 @@ class Board:
                 if neighbor_string is not string:
                     self._replace_string(neighbor_string.with_liberty(point))
             self._grid[point] = None
-            self._hash ^= zobrist.HASH_CODE[point, string.color]
+            self._hash ^= int(
+                self._zobrist.stones[self._zobrist.index(point), string.color.value]
+            )
 
     def place_stone(self, player: Player, point: Point):
         assert self.is_on_grid(point)
@@ -145,7 +148,9 @@ class Board:
             self._grid[new_string_point] = new_string
 
         # Apply the hash code for this point and player
-        self._hash ^= zobrist.HASH_CODE[point, player]
+        self._hash ^= int(
+            self._zobrist.stones[self._zobrist.index(point), player.value]
+        )
 
         # Reduce liberties of any adjacent strings of the opposite color.
         for other_color_string in adjacent_opposite_color:
@@ -233,7 +238,7 @@ class GameState:
         if move.is_pass or move.is_resign:
             return True
         return (
-            self.board.get(move.point) is not None
+            self.board.get(move.point) is None
             and not self.is_move_self_capture(self.next_player, move)
             and not self.does_move_violate_ko(self.next_player, move)
         )
@@ -0,0 +1,869 @@
+import copy
+import threading
+from array import array
+from dataclasses import FrozenInstanceError
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from dlgo import scoring, zobrist
+from dlgo.gotypes import Player, Point
+
+__all__ = [
+    "Board",
+    "GameState",
+    "GoString",
+    "Move",
+    "MoveOutcome",
+    "Point",
+    "PositionHistory",
+]
+
+# Contents of a cell in the flat board array. Stones are stored
+# as Player.value, so black is 1 and white is 2.
+EMPTY = 0
+BORDER = 3
+
+# Maps a cell value back to its player
+_PLAYER_BY_VALUE = (None, Player.black, Player.white, None)
+
+
+class _Geometry:
+    # Everything about a board that depends only on its size.
+    # Points are stored in a flat array padded with one ring of
+    # border cells, so point (row, col) lives at row * stride + col
+    # and every on-board point has four in-range neighbors.
+    def __init__(self, num_rows: int, num_cols: int) -> None:
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.stride = num_cols + 2
+        self.size = (num_rows + 2) * self.stride
+
+        self.empty_stones = array("b", [BORDER] * self.size)
+        self.points: List[Optional[Point]] = [None] * self.size
+        self.on_board: List[int] = []
+        for row in range(1, num_rows + 1):
+            for col in range(1, num_cols + 1):
+                index = row * self.stride + col
+                self.empty_stones[index] = EMPTY
+                self.points[index] = Point(row, col)
+                self.on_board.append(index)
+
+        # Precomputed on-board neighbors of every on-board point,
+        # so the hot loops never build Points or check bounds
+        self.neighbors: List[Tuple[int, ...]] = [()] * self.size
+        for index in self.on_board:
+            self.neighbors[index] = tuple(
+                neighbor
+                for neighbor in (
+                    index - self.stride,
+                    index + self.stride,
+                    index - 1,
+                    index + 1,
+                )
+                if self.empty_stones[neighbor] != BORDER
+            )
+        # Diagonal cells of every on-board point, border cells included
+        self.corners: List[Tuple[int, ...]] = [()] * self.size
+        for index in self.on_board:
+            self.corners[index] = (
+                index - self.stride - 1,
+                index - self.stride + 1,
+                index + self.stride - 1,
+                index + self.stride + 1,
+            )
+
+        # Zobrist codes indexed by [player.value][index], copied out of
+        # the table for this size because it uses the same flat layout
+        # (plain lists, since indexing a NumPy array is slow in hot loops)
+        table = zobrist.get_table(num_rows, num_cols)
+        self.hash_codes: List[List[int]] = table.stones.T.tolist()
+        self.side_to_move_code: int = table.side_to_move
+        self.ko_codes: List[int] = table.ko_point.tolist()
+
+    def index(self, point: Point) -> int:
+        return point.row * self.stride + point.col
+
+
+_GEOMETRIES: Dict[Tuple[int, int], _Geometry] = {}
+
+
+def _get_geometry(num_rows: int, num_cols: int) -> _Geometry:
+    geometry = _GEOMETRIES.get((num_rows, num_cols))
+    if geometry is None:
+        geometry = _Geometry(num_rows, num_cols)
+        _GEOMETRIES[num_rows, num_cols] = geometry
+    return geometry
+
+
+# Clients generally won’t call the Move constructor directly.
+# Instead, you usually call Move.play, Move.pass_turn,
+# or Move.resign to construct an instance of a move
+class Move:
+    # Any action a player can play o a turn:
+    # is_play, is_pass, is_resign
+    __slots__ = ("point", "is_play", "is_pass", "is_resign")
+
+    # Moves are never modified, so the constructors below hand out
+    # one shared instance per point, pass and resign
+    _plays: "Dict[Point, Move]" = {}
+    _pass: "Move"
+    _resign: "Move"
+
+    def __init__(self, point=None, is_pass=False, is_resign=False) -> None:
+        object.__setattr__(self, "point", point)
+        object.__setattr__(self, "is_play", point is not None)
+        object.__setattr__(self, "is_pass", is_pass)
+        object.__setattr__(self, "is_resign", is_resign)
+
+    # Shared instances would be changed for every user at once
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    # Copies and unpickled moves go through the constructors below,
+    # so they are the shared instance too
+    def __reduce__(self):
+        if self.is_play:
+            return (Move.play, (self.point,))
+        return (Move.pass_turn, ()) if self.is_pass else (Move.resign, ())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memodict={}):
+        return self
+
+    @classmethod
+    def play(cls, point: Point):
+        # this move places stone to the board
+        move = cls._plays.get(point)
+        if move is None:
+            # Another thread may have added the point since the lookup;
+            # setdefault keeps whichever move got there first
+            move = cls._plays.setdefault(point, Move(point=point))
+        return move
+
+    @classmethod
+    def pass_turn(cls):
+        # this move passes
+        return cls._pass
+
+    @classmethod
+    def resign(cls):
+        # this move resigns the current game
+        return cls._resign
+
+
+# Made up front, so that every thread gets the same two moves
+Move._pass = Move(is_pass=True)
+Move._resign = Move(is_resign=True)
+
+
+# Go strings are a chain of connected stones of the same color.
+# This is a deliberate break from dlgo.goboard's GoString: stones and
+# liberties are flat board indices rather than Points (Board.points_of
+# turns them back into Points), strings compare by identity since every
+# string on a board is a distinct object, and merge_with and
+# with_liberty are gone because only the board builds strings.
+class GoString:
+    __slots__ = ("color", "stones", "liberties")
+
+    def __init__(
+        self, color: Player, stones: FrozenSet[int], liberties: FrozenSet[int]
+    ) -> None:
+        self.color = color
+        self.stones = stones
+        self.liberties = liberties
+
+    def without_liberty(self, index: int) -> "GoString":
+        return GoString(self.color, self.stones, self.liberties - {index})
+
+    def with_liberties(self, indices) -> "GoString":
+        return GoString(self.color, self.stones, self.liberties | indices)
+
+    @property
+    def num_liberties(self) -> int:
+        return len(self.liberties)
+
+
+class Board:
+    # An empty board is initialized as a flat array of empty points
+    # surrounded by border sentinels
+    def __init__(self, num_rows=19, num_cols=19):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._geometry = _get_geometry(num_rows, num_cols)
+        # Cell contents: EMPTY, BORDER or the Player.value of a stone
+        self._stones = array("b", self._geometry.empty_stones)
+        # The GoString covering each cell, or None
+        self._strings: List[Optional[GoString]] = [None] * self._geometry.size
+        # Number of liberties of the string covering each cell, 0 for
+        # cells without a stone; kept up to date with _strings
+        self._liberty_counts = array("h", bytes(2 * self._geometry.size))
+        self._hash = zobrist.EMPTY_BOARD
+        # Undo records of stones placed with push_stone
+        self._undo_stack: List[_Undo] = []
+
+    def is_on_grid(self, point: Point) -> bool:
+        return 1 <= point.row <= self.num_rows and 1 <= point.col <= self.num_cols
+
+    def index_of(self, point: Point) -> int:
+        return point.row * self._geometry.stride + point.col
+
+    def point_of(self, index: int) -> Optional[Point]:
+        return self._geometry.points[index]
+
+    # The Points of flat indices, e.g. of a GoString's stones or liberties
+    def points_of(self, indices) -> FrozenSet[Point]:
+        points = self._geometry.points
+        return frozenset(points[index] for index in indices)
+
+    # Returns the content of a point on the board: a Player
+    # if a stone is on that point or None
+    def get(self, point: Point) -> Optional[Player]:
+        row, col = point.row, point.col
+        if not (1 <= row <= self.num_rows and 1 <= col <= self.num_cols):
+            return None
+        return _PLAYER_BY_VALUE[self._stones[row * self._geometry.stride + col]]
+
+    # Returns the entire string of stones at a point: a GoString
+    # if a stone is on that point or None
+    def get_go_string(self, point: Point) -> Optional[GoString]:
+        if not self.is_on_grid(point):
+            return None
+        return self._strings[self.index_of(point)]
+
+    # Flat indices run from 0 to num_cells - 1, border cells included
+    @property
+    def num_cells(self) -> int:
+        return self._geometry.size
+
+    # Flat indices of all on-board points, row by row
+    def on_board_indices(self) -> List[int]:
+        return self._geometry.on_board
+
+    # Flat indices of the on-board neighbors of an on-board point
+    def neighbors_of(self, index: int) -> Tuple[int, ...]:
+        return self._geometry.neighbors[index]
+
+    # Flat indices of the four diagonal cells of an on-board point,
+    # border cells included
+    def corners_of(self, index: int) -> Tuple[int, ...]:
+        return self._geometry.corners[index]
+
+    # neighbors_of and corners_of for every flat index at once, for
+    # loops that look up many points. The tables are shared by all
+    # boards of this size and must not be changed.
+    def neighbor_table(self) -> List[Tuple[int, ...]]:
+        return self._geometry.neighbors
+
+    def corner_table(self) -> List[Tuple[int, ...]]:
+        return self._geometry.corners
+
+    # Content of a cell: EMPTY, BORDER or the Player.value of a stone
+    def cell(self, index: int) -> int:
+        return self._stones[index]
+
+    # A copy of the contents of every cell, indexed by flat index
+    def cells(self) -> List[int]:
+        return list(self._stones)
+
+    # The GoString covering a cell, or None
+    def string_at(self, index: int) -> Optional[GoString]:
+        return self._strings[index]
+
+    # Every string on the board, each once
+    def strings(self) -> List[GoString]:
+        return list({id(s): s for s in self._strings if s is not None}.values())
+
+    # Whether playing at an empty point would fill one of player's eyes
+    def is_eye(self, index: int, player: Player) -> bool:
+        return self._is_eye(index, player.value)
+
+    def place_stone(self, player: Player, point: Point):
+        assert self.is_on_grid(point)
+        index = self.index_of(point)
+        assert self._stones[index] == EMPTY
+        self._place(player, index, [], [])
+
+    # Places a stone that can be taken back with pop_stone. Used to
+    # probe a move on this board without copying it.
+    def push_stone(self, player: Player, point: Point) -> None:
+        assert self.is_on_grid(point)
+        index = self.index_of(point)
+        assert self._stones[index] == EMPTY
+        undo = _Undo(index, self._hash)
+        self._place(player, index, undo.replaced, undo.captured)
+        self._undo_stack.append(undo)
+
+    # Takes back the last stone placed with push_stone
+    def pop_stone(self) -> None:
+        undo = self._undo_stack.pop()
+        strings = self._strings
+        liberty_counts = self._liberty_counts
+        # Strings were replaced one after the other, so restoring
+        # them in reverse order leaves the oldest version in place.
+        for old_string in reversed(undo.replaced):
+            num_liberties = len(old_string.liberties)
+            for stone in old_string.stones:
+                strings[stone] = old_string
+                liberty_counts[stone] = num_liberties
+        for captured in undo.captured:
+            value = captured.color.value
+            num_liberties = len(captured.liberties)
+            for stone in captured.stones:
+                strings[stone] = captured
+                liberty_counts[stone] = num_liberties
+                self._stones[stone] = value
+        strings[undo.index] = None
+        liberty_counts[undo.index] = 0
+        self._stones[undo.index] = EMPTY
+        self._hash = undo.hash
+
+    # Places a stone and records every string it replaced or captured
+    # into the given lists, so that the move can be undone.
+    def _place(
+        self,
+        player: Player,
+        index: int,
+        replaced: List[GoString],
+        captured: List[GoString],
+    ) -> None:
+        strings = self._strings
+        neighbors = self._geometry.neighbors
+        adjacent_same_color = []
+        adjacent_opposite_color = []
+        liberties = set()
+        # Examine direct neighbors of this point.
+        for neighbor in neighbors[index]:
+            neighbor_string = strings[neighbor]
+            if neighbor_string is None:
+                liberties.add(neighbor)
+            elif neighbor_string.color is player:
+                if neighbor_string not in adjacent_same_color:
+                    adjacent_same_color.append(neighbor_string)
+            elif neighbor_string not in adjacent_opposite_color:
+                adjacent_opposite_color.append(neighbor_string)
+
+        # Merge any adjacent strings of the same color
+        stones = {index}
+        for same_color_string in adjacent_same_color:
+            stones |= same_color_string.stones
+            liberties |= same_color_string.liberties
+            replaced.append(same_color_string)
+        liberties.discard(index)
+        new_string = GoString(player, frozenset(stones), frozenset(liberties))
+        liberty_counts = self._liberty_counts
+        num_liberties = len(liberties)
+        for stone in new_string.stones:
+            strings[stone] = new_string
+            liberty_counts[stone] = num_liberties
+
+        # Apply the hash code for this point and player
+        self._stones[index] = player.value
+        self._hash ^= self._geometry.hash_codes[player.value][index]
+
+        # Reduce liberties of any adjacent strings of the opposite color.
+        for other_color_string in adjacent_opposite_color:
+            if other_color_string.num_liberties > 1:
+                self._replace_string(other_color_string.without_liberty(index))
+                replaced.append(other_color_string)
+            else:
+                # If any opposite-color strings now have zero liberties, remove them.
+                self._remove_string(other_color_string, replaced)
+                captured.append(other_color_string)
+
+    def _replace_string(self, new_string: GoString) -> None:
+        strings = self._strings
+        liberty_counts = self._liberty_counts
+        num_liberties = len(new_string.liberties)
+        for stone in new_string.stones:
+            strings[stone] = new_string
+            liberty_counts[stone] = num_liberties
+
+    def _remove_string(self, string: GoString, replaced: List[GoString]) -> None:
+        strings = self._strings
+        neighbors = self._geometry.neighbors
+        codes = self._geometry.hash_codes[string.color.value]
+        # Removing a string can create liberties for other strings;
+        # collect them first so each neighbor string is rebuilt once.
+        new_liberties: Dict[int, Tuple[GoString, set]] = {}
+        for stone in string.stones:
+            for neighbor in neighbors[stone]:
+                neighbor_string = strings[neighbor]
+                if neighbor_string is None or neighbor_string is string:
+                    continue
+                entry = new_liberties.get(id(neighbor_string))
+                if entry is None:
+                    new_liberties[id(neighbor_string)] = (neighbor_string, {stone})
+                else:
+                    entry[1].add(stone)
+            strings[stone] = None
+            self._liberty_counts[stone] = 0
+            self._stones[stone] = EMPTY
+            self._hash ^= codes[stone]
+        for neighbor_string, liberties in new_liberties.values():
+            self._replace_string(neighbor_string.with_liberties(liberties))
+            replaced.append(neighbor_string)
+
+    def zobrist_hash(self):
+        return self._hash
+
+    # Read-only int8 array of shape (num_rows, num_cols) holding 0 for
+    # empty points and Player.value for stones, with [row - 1, col - 1]
+    # corresponding to Point(row, col). It is a view of the board, so it
+    # shows later moves too; copy it to keep a snapshot.
+    def stone_array(self) -> np.ndarray:
+        cells = np.frombuffer(self._stones, dtype=np.int8)
+        cells = cells.reshape(self.num_rows + 2, self._geometry.stride)
+        stones = cells[1:-1, 1:-1]
+        stones.flags.writeable = False
+        return stones
+
+    # Read-only int16 view like stone_array, holding the number of
+    # liberties of the string each stone belongs to and 0 for empty points
+    def liberty_array(self) -> np.ndarray:
+        cells = np.frombuffer(self._liberty_counts, dtype=np.int16)
+        cells = cells.reshape(self.num_rows + 2, self._geometry.stride)
+        liberties = cells[1:-1, 1:-1]
+        liberties.flags.writeable = False
+        return liberties
+
+    # Same rule as dlgo.agent.helpers.is_point_an_eye, on flat indices
+    def _is_eye(self, index: int, value: int) -> bool:
+        stones = self._stones
+        if stones[index] != EMPTY:
+            return False
+        # All adjacent points must contain friendly stones.
+        for neighbor in self._geometry.neighbors[index]:
+            if stones[neighbor] != value:
+                return False
+        friendly_corners = 0
+        off_board_corners = 0
+        for corner in self._geometry.corners[index]:
+            if stones[corner] == value:
+                friendly_corners += 1
+            elif stones[corner] == BORDER:
+                off_board_corners += 1
+        if off_board_corners > 0:
+            # Point is on the edge or corner.
+            return off_board_corners + friendly_corners == 4
+        # Point is in the middle.
+        return friendly_corners >= 3
+
+    # The geometry is shared by all boards of a size, so it is not
+    # pickled along with the board but looked up again when loading
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_geometry"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._geometry = _get_geometry(self.num_rows, self.num_cols)
+
+    # GoStrings are immutable, so a copy only needs its own arrays
+    # and can share every string with the original board.
+    def __deepcopy__(self, memodict={}):
+        copied = Board.__new__(Board)
+        copied.num_rows = self.num_rows
+        copied.num_cols = self.num_cols
+        copied._geometry = self._geometry
+        copied._stones = self._stones[:]
+        copied._strings = self._strings[:]
+        copied._liberty_counts = self._liberty_counts[:]
+        copied._hash = self._hash
+        copied._undo_stack = []
+        return copied
+
+
+class _Undo:
+    # What push_stone needs to restore the board it changed
+    __slots__ = ("index", "hash", "replaced", "captured")
+
+    def __init__(self, index: int, hash: int) -> None:
+        self.index = index
+        self.hash = hash
+        self.replaced: List[GoString] = []
+        self.captured: List[GoString] = []
+
+
+class _HistorySegment:
+    # Positions appended along one line of play. positions[player.value]
+    # maps a board hash to the first place it was appended at; entries
+    # keeps (player.value, hash) pairs in order.
+    __slots__ = ("parent", "parent_length", "depth", "positions", "entries")
+
+    def __init__(
+        self, parent: "Optional[_HistorySegment]" = None, parent_length: int = 0
+    ) -> None:
+        self.parent = parent
+        # How many entries of the parent segment come before this one
+        self.parent_length = parent_length
+        # Number of segments above this one
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.positions: Tuple[Dict[int, int], ...] = ({}, {}, {})
+        self.entries: List[Tuple[int, int]] = []
+
+    def append(self, value: int, board_hash: int) -> None:
+        self.positions[value].setdefault(board_hash, len(self.entries))
+        self.entries.append((value, board_hash))
+
+
+_HISTORY_LOCK = threading.Lock()
+
+
+class PositionHistory:
+    # The (player, board hash) pairs of all positions before a game state,
+    # used for positional superko. Instead of each state holding its own
+    # set, states along a line of play share one segment: a child of the
+    # newest state appends to it in O(1). A child of any other state (a
+    # second branch in a search tree) starts a new segment linked to the
+    # shared prefix, and a chain that gets too deep is flattened, so
+    # lookups check at most MAX_DEPTH + 1 dicts.
+    #
+    # Memory per state is amortized, not constant: appending is O(1),
+    # but every MAX_DEPTH forks in a row a flatten copies the whole
+    # history so far. In a search, each real move forks the game line,
+    # so a search pays an O(game length) copy now and then.
+    MAX_DEPTH = 8
+
+    __slots__ = ("_segment", "_length")
+
+    def __init__(
+        self, segment: Optional[_HistorySegment] = None, length: int = 0
+    ) -> None:
+        self._segment = _HistorySegment() if segment is None else segment
+        # Number of entries of the segment that belong to this history
+        self._length = length
+
+    # Returns the history with one more position appended. Checking
+    # whether this is the newest history of its segment and appending
+    # to it happen under one lock, so two threads extending the same
+    # history (e.g. expanding one search node) fork instead of both
+    # appending to the shared segment.
+    def extended(self, player: Player, board_hash: int) -> "PositionHistory":
+        with _HISTORY_LOCK:
+            segment = self._segment
+            if len(segment.entries) != self._length:
+                if segment.depth < self.MAX_DEPTH:
+                    segment = _HistorySegment(segment, self._length)
+                else:
+                    segment = self._flattened()
+            segment.append(player.value, board_hash)
+            return PositionHistory(segment, len(segment.entries))
+
+    def _flattened(self) -> _HistorySegment:
+        chunks = []
+        segment, length = self._segment, self._length
+        while segment is not None:
+            chunks.append(segment.entries[:length])
+            segment, length = segment.parent, segment.parent_length
+        flat = _HistorySegment()
+        for chunk in reversed(chunks):
+            for value, board_hash in chunk:
+                flat.append(value, board_hash)
+        return flat
+
+    # Whether the position board_hash with player.value to move was seen
+    def seen(self, value: int, board_hash: int) -> bool:
+        segment, length = self._segment, self._length
+        while segment is not None:
+            position = segment.positions[value].get(board_hash)
+            if position is not None and position < length:
+                return True
+            segment, length = segment.parent, segment.parent_length
+        return False
+
+    def __contains__(self, situation: Tuple[Player, int]) -> bool:
+        player, board_hash = situation
+        return self.seen(player.value, board_hash)
+
+    # Number of positions before the state, repeated ones included
+    def __len__(self) -> int:
+        total = 0
+        segment, length = self._segment, self._length
+        while segment is not None:
+            total += length
+            segment, length = segment.parent, segment.parent_length
+        return total
+
+
+# Everything GameState.evaluate_move learns from playing a move once
+class MoveOutcome:
+    __slots__ = ("is_legal", "num_liberties", "num_captured", "zobrist_hash", "state")
+
+    def __init__(
+        self,
+        is_legal: bool,
+        num_liberties: int = 0,
+        num_captured: int = 0,
+        zobrist_hash: Optional[int] = None,
+        state: "Optional[GameState]" = None,
+    ) -> None:
+        self.is_legal = is_legal
+        # Liberties of the string the new stone belongs to
+        self.num_liberties = num_liberties
+        # Number of opponent stones the move removes
+        self.num_captured = num_captured
+        # Zobrist hash of the board after the move
+        self.zobrist_hash = zobrist_hash
+        # The resulting game state, only set for legal moves
+        self.state = state
+
+
+class GameState:
+    def __init__(
+        self,
+        board: Board,
+        next_player: Player,
+        previous: "Optional[GameState]",
+        move: Optional[Move],
+    ):
+        self.board = board
+        self.next_player = next_player
+        self.previous_state = previous
+        if previous is None:
+            self.previous_states = PositionHistory()
+        else:
+            self.previous_states = previous.previous_states.extended(
+                previous.next_player, previous.board.zobrist_hash()
+            )
+        self.last_move = move
+
+    # Returns the new GameState after applying the move
+    def apply_move(self, move: Move) -> "GameState":
+        if move.is_play:
+            next_board = copy.deepcopy(self.board)
+            next_board.place_stone(self.next_player, move.point)
+        else:
+            next_board = self.board
+        return GameState(next_board, self.next_player.other, self, move)
+
+    # A copy of this state without the chain of earlier states, which
+    # keeps only what the rules need: the superko history and the move
+    # before the last one. Cheap to pickle, e.g. to send to a worker.
+    def detached(self) -> "GameState":
+        previous = None
+        if self.previous_state is not None:
+            previous = GameState(
+                self.previous_state.board,
+                self.previous_state.next_player,
+                None,
+                self.previous_state.last_move,
+            )
+        state = GameState(self.board, self.next_player, previous, self.last_move)
+        state.previous_states = self.previous_states
+        return state
+
+    @classmethod
+    def new_game(cls, board_size=19):
+        board = Board(board_size, board_size)
+        return cls(board, Player.black, None, None)
+
+    def is_over(self) -> bool:
+        if self.last_move is None:
+            return False
+        if self.last_move.is_resign:
+            return True
+        second_last_move = (
+            self.previous_state.last_move if self.previous_state else None
+        )
+        if second_last_move is None:
+            return False
+        return self.last_move.is_pass and second_last_move.is_pass
+
+    # The winner of a finished game: the player who didn't resign,
+    # or the one ahead on area with komi; None while the game goes on
+    def winner(self) -> Optional[Player]:
+        if not self.is_over():
+            return None
+        if self.last_move.is_resign:
+            return self.next_player
+        return scoring.compute_game_result(self).winner
+
+    def is_move_self_capture(self, player, move):
+        if not move.is_play:
+            return False
+        return self._prober(player)(self.board.index_of(move.point)) < 0
+
+    # The point the opponent may not play at right away because it would
+    # retake a single-stone ko, or None. The last move is a ko capture if
+    # its stone stands alone with one liberty where an opponent stone
+    # stood a move ago: every string it captured would have left it a
+    # liberty, so that stone was the only one taken.
+    @property
+    def ko_point(self) -> Optional[Point]:
+        if self.last_move is None or not self.last_move.is_play:
+            return None
+        if self.previous_state is None:
+            return None
+        string = self.board.get_go_string(self.last_move.point)
+        if len(string.stones) != 1 or len(string.liberties) != 1:
+            return None
+        (liberty,) = string.liberties
+        point = self.board.point_of(liberty)
+        captured = self.previous_state.board.get_go_string(point)
+        if captured is None or len(captured.stones) != 1:
+            return None
+        return point
+
+    # Hash of the whole situation, not just the stones: the side to move
+    # and the ko point are mixed in, so it can key transposition tables
+    def zobrist_hash(self) -> int:
+        board = self.board
+        situation_hash = board.zobrist_hash()
+        if self.next_player is Player.white:
+            situation_hash ^= board._geometry.side_to_move_code
+        ko_point = self.ko_point
+        if ko_point is not None:
+            situation_hash ^= board._geometry.ko_codes[board.index_of(ko_point)]
+        return situation_hash
+
+    @property
+    def situation(self):
+        return (self.next_player, self.board)
+
+    def does_move_violate_ko(self, player: Player, move: Move) -> bool:
+        if not move.is_play:
+            return False
+        # A self-capture leaves a position that never occurred, so the
+        # probe's -1 is never in the history either
+        next_hash = self._prober(player)(self.board.index_of(move.point))
+        return self.previous_states.seen(player.other.value, next_hash)
+
+    # Returns every legal play, then pass and resign. With exclude_eyes,
+    # plays that would fill one of our own eyes are left out.
+    def legal_moves(self, exclude_eyes=False) -> List[Move]:
+        if self.is_over():
+            return []
+        board = self.board
+        moves = [
+            Move.play(board.point_of(index))
+            for index in self.legal_indices(exclude_eyes)
+        ]
+        # These two moves are always legal.
+        moves.append(Move.pass_turn())
+        moves.append(Move.resign())
+        return moves
+
+    # Boolean array of shape (num_rows, num_cols); True marks a legal
+    # play, with [row - 1, col - 1] corresponding to Point(row, col).
+    def legal_move_mask(self, exclude_eyes=False) -> np.ndarray:
+        board = self.board
+        mask = np.zeros((board.num_rows, board.num_cols), dtype=bool)
+        if self.is_over():
+            return mask
+        indices = np.asarray(self.legal_indices(exclude_eyes), dtype=np.intp)
+        rows, cols = np.divmod(indices, board._geometry.stride)
+        mask[rows - 1, cols - 1] = True
+        return mask
+
+    # Flat indices of all legal plays, found in one pass over the
+    # empty points with the same probe as _is_legal_index
+    def legal_indices(self, exclude_eyes=False) -> List[int]:
+        board = self.board
+        stones = board._stones
+        player = self.next_player
+        value = player.value
+        opponent_value = player.other.value
+        probe = self._prober(player)
+        seen = self.previous_states.seen
+        legal = []
+        for index in board._geometry.on_board:
+            if stones[index] != EMPTY:
+                continue
+            next_hash = probe(index)
+            if next_hash < 0 or seen(opponent_value, next_hash):
+                continue
+            if exclude_eyes and board._is_eye(index, value):
+                continue
+            legal.append(index)
+        return legal
+
+    # Whether the player to move may play at an empty point, by
+    # self-capture and superko
+    def _is_legal_index(self, index: int) -> bool:
+        player = self.next_player
+        next_hash = self._prober(player)(index)
+        return next_hash >= 0 and not self.previous_states.seen(
+            player.other.value, next_hash
+        )
+
+    # Returns probe(index), which tells what a stone of player at an
+    # empty point would do without placing it. Liberty counts of the
+    # neighboring strings decide self-capture and captures, and the
+    # probe returns the Zobrist hash of the board after the stone and
+    # its captures, or -1 if the stone's string would have no liberty.
+    # Nothing is changed, so other threads may read the board meanwhile.
+    def _prober(self, player: Player) -> Callable[[int], int]:
+        board = self.board
+        strings = board._strings
+        neighbors = board._geometry.neighbors
+        player_codes = board._geometry.hash_codes[player.value]
+        opponent_codes = board._geometry.hash_codes[player.other.value]
+        board_hash = board._hash
+
+        def probe(index: int) -> int:
+            has_liberty = False
+            next_hash = board_hash ^ player_codes[index]
+            captured: List[GoString] = []
+            for neighbor in neighbors[index]:
+                string = strings[neighbor]
+                if string is None:
+                    has_liberty = True
+                elif string.color is player:
+                    if len(string.liberties) > 1:
+                        has_liberty = True
+                elif len(string.liberties) == 1 and string not in captured:
+                    has_liberty = True
+                    captured.append(string)
+                    for stone in string.stones:
+                        next_hash ^= opponent_codes[stone]
+            return next_hash if has_liberty else -1
+
+        return probe
+
+    # Checks a move and plays it in the same pass: the stone is placed
+    # once on a copy of the board, and for legal moves the copy becomes
+    # the board of the returned state.
+    def evaluate_move(self, move: Move) -> MoveOutcome:
+        if self.is_over():
+            return MoveOutcome(False)
+        if not move.is_play:
+            return MoveOutcome(
+                True,
+                zobrist_hash=self.board.zobrist_hash(),
+                state=self.apply_move(move),
+            )
+        if self.board.get(move.point) is not None:
+            return MoveOutcome(False)
+        player = self.next_player
+        next_board = copy.deepcopy(self.board)
+        index = next_board.index_of(move.point)
+        captured: List[GoString] = []
+        next_board._place(player, index, [], captured)
+        num_liberties = next_board._strings[index].num_liberties
+        num_captured = sum(len(string.stones) for string in captured)
+        next_hash = next_board.zobrist_hash()
+        if num_liberties == 0 or (player.other, next_hash) in self.previous_states:
+            return MoveOutcome(False, num_liberties, num_captured, next_hash)
+        return MoveOutcome(
+            True,
+            num_liberties,
+            num_captured,
+            next_hash,
+            GameState(next_board, player.other, self, move),
+        )
+
+    def is_valid_move(self, move: Move):
+        if self.is_over():
+            return False
+        if move.is_pass or move.is_resign:
+            return True
+        if self.board.get(move.point) is not None:
+            return False
+        return self._is_legal_index(self.board.index_of(move.point))
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
+import functools
+from dataclasses import FrozenInstanceError
 from enum import Enum
+from typing import Dict, Tuple
 
 
 class Player(Enum):
@@ -13,16 +15,83 @@ class Player(Enum):
         return Player.black if self == Player.white else Player.white
 
 
-# Coordinates on the board
-@dataclass(frozen=True)
+# Coordinates on the board. Points are interned: Point(row, col) always
+# returns the same instance, so equality and hashing are by identity and
+# neighbors can be computed once per point and cached on it.
 class Point:
-    row: int
-    col: int
-
-    def neighbors(self):
-        return [
-            Point(self.row - 1, self.col),
-            Point(self.row + 1, self.col),
-            Point(self.row, self.col - 1),
-            Point(self.row, self.col + 1),
-        ]
+    __slots__ = ("row", "col", "_neighbors", "_corners")
+
+    _interned: Dict[Tuple[int, int], "Point"] = {}
+
+    def __new__(cls, row: int, col: int) -> "Point":
+        point = cls._interned.get((row, col))
+        if point is None:
+            point = object.__new__(cls)
+            object.__setattr__(point, "row", row)
+            object.__setattr__(point, "col", col)
+            object.__setattr__(point, "_neighbors", None)
+            object.__setattr__(point, "_corners", None)
+            # Another thread may have interned the point since the
+            # lookup; setdefault keeps whichever instance got there first
+            point = cls._interned.setdefault((row, col), point)
+        return point
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    # Copies and unpickled points go through __new__ again,
+    # so they are the interned instance too
+    def __reduce__(self):
+        return (Point, (self.row, self.col))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memodict={}):
+        return self
+
+    def __repr__(self) -> str:
+        return f"Point(row={self.row}, col={self.col})"
+
+    def neighbors(self) -> Tuple["Point", ...]:
+        neighbors = self._neighbors
+        if neighbors is None:
+            neighbors = (
+                Point(self.row - 1, self.col),
+                Point(self.row + 1, self.col),
+                Point(self.row, self.col - 1),
+                Point(self.row, self.col + 1),
+            )
+            object.__setattr__(self, "_neighbors", neighbors)
+        return neighbors
+
+    # The four diagonal points
+    def corners(self) -> Tuple["Point", ...]:
+        corners = self._corners
+        if corners is None:
+            corners = (
+                Point(self.row - 1, self.col - 1),
+                Point(self.row - 1, self.col + 1),
+                Point(self.row + 1, self.col - 1),
+                Point(self.row + 1, self.col + 1),
+            )
+            object.__setattr__(self, "_corners", corners)
+        return corners
+
+
+# All points of a board, row by row, created once per board size
+# together with their neighbors and corners
+@functools.lru_cache(maxsize=None)
+def board_points(num_rows: int, num_cols: int) -> Tuple[Point, ...]:
+    points = tuple(
+        Point(row, col)
+        for row in range(1, num_rows + 1)
+        for col in range(1, num_cols + 1)
+    )
+    for point in points:
+        point.neighbors()
+        point.corners()
+    return points
@@ -0,0 +1,287 @@
+import random
+from typing import List, Optional
+
+from dlgo.goboard_fast import BORDER, EMPTY, GameState
+from dlgo.gotypes import Player
+from dlgo.scoring import KOMI, GameResult, Territory
+
+__all__ = ["play_random_game"]
+
+
+class _Playout:
+    # A scratch copy of a position made for playing one random game to
+    # the end as fast as possible. Everything is a plain list over the
+    # flat board layout of goboard_fast, changed in place: no GameState,
+    # no history beyond the simple ko point, no copies.
+    #
+    # Strings are circular linked lists of stones (next_stone) with a
+    # head stone that holds the string's size and its pseudo-liberties:
+    # the number of (stone, empty neighbor) pairs, and the sum and sum
+    # of squares of those empty neighbors. A string is in atari exactly
+    # when all its pseudo-liberties are the same point, which is when
+    # count * sum of squares == sum ** 2.
+    def __init__(self, game_state: GameState) -> None:
+        board = game_state.board
+        self.neighbors = board.neighbor_table()
+        self.corners = board.corner_table()
+        self.on_board = board.on_board_indices()
+        self.num_points = len(self.on_board)
+        size = board.num_cells
+        color = board.cells()
+        self.color = color
+        self.head = list(range(size))
+        self.next_stone = list(range(size))
+        self.string_size = [1] * size
+        self.libs = [0] * size
+        self.lib_sum = [0] * size
+        self.lib_sq = [0] * size
+
+        for string in board.strings():
+            stones = sorted(string.stones)
+            head = stones[0]
+            for stone, next_stone in zip(stones, stones[1:] + stones[:1]):
+                self.head[stone] = head
+                self.next_stone[stone] = next_stone
+            self.string_size[head] = len(stones)
+            for stone in stones:
+                for neighbor in self.neighbors[stone]:
+                    if color[neighbor] == EMPTY:
+                        self.libs[head] += 1
+                        self.lib_sum[head] += neighbor
+                        self.lib_sq[head] += neighbor * neighbor
+
+        self.empty_points = [index for index in self.on_board if color[index] == EMPTY]
+        self.position = [0] * size
+        for position, index in enumerate(self.empty_points):
+            self.position[index] = position
+
+        ko_point = game_state.ko_point
+        self.ko = -1 if ko_point is None else board.index_of(ko_point)
+
+    # Same rule as Board.is_eye
+    def is_eye(self, index: int, value: int) -> bool:
+        color = self.color
+        for neighbor in self.neighbors[index]:
+            if color[neighbor] != value:
+                return False
+        friendly_corners = 0
+        off_board_corners = 0
+        for corner in self.corners[index]:
+            if color[corner] == value:
+                friendly_corners += 1
+            elif color[corner] == BORDER:
+                off_board_corners += 1
+        if off_board_corners > 0:
+            return off_board_corners + friendly_corners == 4
+        return friendly_corners >= 3
+
+    # Whether an empty point can be played, ignoring superko
+    def is_legal(self, index: int, value: int) -> bool:
+        if index == self.ko:
+            return False
+        color = self.color
+        neighbors = self.neighbors[index]
+        for neighbor in neighbors:
+            if color[neighbor] == EMPTY:
+                return True
+        head = self.head
+        libs = self.libs
+        lib_sum = self.lib_sum
+        lib_sq = self.lib_sq
+        for neighbor in neighbors:
+            string = head[neighbor]
+            in_atari = libs[string] * lib_sq[string] == lib_sum[string] ** 2
+            if color[neighbor] == value:
+                # Joining a string with another liberty
+                if not in_atari:
+                    return True
+            elif in_atari:
+                # Capturing a string whose last liberty this is
+                return True
+        return False
+
+    def play(self, index: int, value: int) -> None:
+        color = self.color
+        head = self.head
+        next_stone = self.next_stone
+        string_size = self.string_size
+        libs = self.libs
+        lib_sum = self.lib_sum
+        lib_sq = self.lib_sq
+        neighbors = self.neighbors[index]
+
+        color[index] = value
+        self._remove_empty(index)
+        head[index] = index
+        next_stone[index] = index
+        string_size[index] = 1
+        libs[index] = lib_sum[index] = lib_sq[index] = 0
+        square = index * index
+        for neighbor in neighbors:
+            if color[neighbor] == EMPTY:
+                libs[index] += 1
+                lib_sum[index] += neighbor
+                lib_sq[index] += neighbor * neighbor
+            else:
+                string = head[neighbor]
+                libs[string] -= 1
+                lib_sum[string] -= index
+                lib_sq[string] -= square
+
+        string = index
+        for neighbor in neighbors:
+            if color[neighbor] == value and head[neighbor] != string:
+                string = self._merge(string, head[neighbor])
+
+        opponent = 3 - value
+        num_captured = 0
+        captured_point = -1
+        for neighbor in neighbors:
+            if color[neighbor] == opponent and libs[head[neighbor]] == 0:
+                captured_point = neighbor
+                num_captured += self._capture(head[neighbor])
+
+        if num_captured == 1 and string_size[string] == 1 and libs[string] == 1:
+            self.ko = captured_point
+        else:
+            self.ko = -1
+
+    # Joins two strings and returns the head of the result
+    def _merge(self, first: int, second: int) -> int:
+        string_size = self.string_size
+        if string_size[first] < string_size[second]:
+            first, second = second, first
+        head = self.head
+        next_stone = self.next_stone
+        stone = second
+        while True:
+            head[stone] = first
+            stone = next_stone[stone]
+            if stone == second:
+                break
+        next_stone[first], next_stone[second] = next_stone[second], next_stone[first]
+        string_size[first] += string_size[second]
+        self.libs[first] += self.libs[second]
+        self.lib_sum[first] += self.lib_sum[second]
+        self.lib_sq[first] += self.lib_sq[second]
+        return first
+
+    # Takes a string off the board and returns its number of stones
+    def _capture(self, string: int) -> int:
+        color = self.color
+        next_stone = self.next_stone
+        stones = [string]
+        stone = next_stone[string]
+        while stone != string:
+            stones.append(stone)
+            stone = next_stone[stone]
+        for stone in stones:
+            color[stone] = EMPTY
+            self._add_empty(stone)
+        head = self.head
+        libs = self.libs
+        lib_sum = self.lib_sum
+        lib_sq = self.lib_sq
+        for stone in stones:
+            square = stone * stone
+            for neighbor in self.neighbors[stone]:
+                if color[neighbor] != EMPTY:
+                    neighbor_string = head[neighbor]
+                    libs[neighbor_string] += 1
+                    lib_sum[neighbor_string] += stone
+                    lib_sq[neighbor_string] += square
+        return len(stones)
+
+    def _add_empty(self, index: int) -> None:
+        self.position[index] = len(self.empty_points)
+        self.empty_points.append(index)
+
+    def _remove_empty(self, index: int) -> None:
+        last = self.empty_points.pop()
+        if last != index:
+            position = self.position[index]
+            self.empty_points[position] = last
+            self.position[last] = position
+
+    # Plays random moves that don't fill one of the player's own eyes,
+    # passing when there are none, until both players pass in a row or
+    # max_moves have been played. If given, record gets the flat index
+    # of every move, or -1 for passes.
+    def play_out(
+        self,
+        value: int,
+        passes: int,
+        max_moves: int,
+        record: Optional[List[int]] = None,
+    ) -> None:
+        empty_points = self.empty_points
+        position = self.position
+        is_eye = self.is_eye
+        is_legal = self.is_legal
+        rand = random.random
+        for _ in range(max_moves):
+            # Candidates are drawn from the front of empty_points;
+            # rejected ones are swapped behind the candidates
+            num_candidates = len(empty_points)
+            move = -1
+            while num_candidates:
+                choice = int(rand() * num_candidates)
+                index = empty_points[choice]
+                if not is_eye(index, value) and is_legal(index, value):
+                    move = index
+                    break
+                num_candidates -= 1
+                last = empty_points[num_candidates]
+                empty_points[choice] = last
+                empty_points[num_candidates] = index
+                position[last] = choice
+                position[index] = num_candidates
+            if record is not None:
+                record.append(move)
+            if move < 0:
+                passes += 1
+                self.ko = -1
+                if passes == 2:
+                    break
+            else:
+                passes = 0
+                self.play(move, value)
+            value = 3 - value
+
+    def territory(self) -> Territory:
+        return Territory.from_cells(self.color, self.neighbors, self.on_board)
+
+
+def play_random_game(
+    game_state: GameState,
+    komi: float = KOMI,
+    max_moves: Optional[int] = None,
+    moves: Optional[List[int]] = None,
+) -> Player:
+    """Plays random moves from game_state to the end and returns the winner.
+
+    Neither player fills their own eyes, and the game ends when both
+    pass in a row; it is then scored like compute_game_result, by
+    Tromp-Taylor area with komi for white. Only simple ko is enforced,
+    so max_moves (three times the number of points by default) stops
+    games caught in a longer cycle.
+
+    If a moves list is given, the moves played are appended to it as
+    flat board indices (Board.index_of), with -1 for a pass. Players
+    alternate, starting with game_state.next_player.
+    """
+    if game_state.is_over():
+        if game_state.last_move.is_resign:
+            return game_state.next_player
+        passes = 2
+    elif game_state.last_move is not None and game_state.last_move.is_pass:
+        passes = 1
+    else:
+        passes = 0
+    playout = _Playout(game_state)
+    if passes < 2:
+        if max_moves is None:
+            max_moves = 3 * playout.num_points
+        playout.play_out(game_state.next_player.value, passes, max_moves, moves)
+    territory = playout.territory()
+    return GameResult(territory.black_area, territory.white_area, komi).winner
@@ -0,0 +1,109 @@
+from collections import namedtuple
+from typing import List, Sequence
+
+from dlgo.gotypes import Player
+
+__all__ = ["GameResult", "Territory", "compute_game_result", "evaluate_territory"]
+
+# Default compensation for white moving second
+KOMI = 7.5
+
+_EMPTY = 0
+_BLACK = Player.black.value
+_WHITE = Player.white.value
+
+
+class Territory:
+    # Stones, territory and neutral points (dame) of a board. An empty
+    # region is territory of a color if only stones of that color border
+    # it, as in Tromp-Taylor rules; dead stones are not removed.
+    def __init__(self) -> None:
+        self.num_black_stones = 0
+        self.num_white_stones = 0
+        self.num_black_territory = 0
+        self.num_white_territory = 0
+        self.num_dame = 0
+
+    # Counts a board given as a flat array of cells (0 for empty,
+    # Player.value for stones), the neighbors of every cell and the
+    # cells that are on the board, like goboard_fast's board layout.
+    # Empty regions are flood filled once each; the colors bordering a
+    # region are or-ed together, so 3 means both.
+    @classmethod
+    def from_cells(
+        cls,
+        cells: Sequence[int],
+        neighbors: Sequence[Sequence[int]],
+        on_board: Sequence[int],
+    ) -> "Territory":
+        territory = cls()
+        sizes = [0, 0, 0, 0]
+        visited = bytearray(len(cells))
+        for index in on_board:
+            value = cells[index]
+            if value != _EMPTY:
+                sizes[value] += 1
+                continue
+            if visited[index]:
+                continue
+            visited[index] = 1
+            region: List[int] = [index]
+            borders = 0
+            for point in region:
+                for neighbor in neighbors[point]:
+                    neighbor_value = cells[neighbor]
+                    if neighbor_value != _EMPTY:
+                        borders |= neighbor_value
+                    elif not visited[neighbor]:
+                        visited[neighbor] = 1
+                        region.append(neighbor)
+            if borders == _BLACK:
+                territory.num_black_territory += len(region)
+            elif borders == _WHITE:
+                territory.num_white_territory += len(region)
+            else:
+                territory.num_dame += len(region)
+        territory.num_black_stones = sizes[_BLACK]
+        territory.num_white_stones = sizes[_WHITE]
+        return territory
+
+    @property
+    def black_area(self) -> int:
+        return self.num_black_stones + self.num_black_territory
+
+    @property
+    def white_area(self) -> int:
+        return self.num_white_stones + self.num_white_territory
+
+
+class GameResult(namedtuple("GameResult", "b w komi")):
+    # Area of black (b) and white (w), and komi added to white's area
+
+    @property
+    def winner(self) -> Player:
+        if self.b > self.w + self.komi:
+            return Player.black
+        return Player.white
+
+    @property
+    def winning_margin(self) -> float:
+        return abs(self.b - (self.w + self.komi))
+
+    def __str__(self) -> str:
+        white = self.w + self.komi
+        if self.b > white:
+            return f"B+{self.b - white:.1f}"
+        return f"W+{white - self.b:.1f}"
+
+
+# Takes a goboard_fast.Board
+def evaluate_territory(board) -> Territory:
+    return Territory.from_cells(
+        board.cells(), board.neighbor_table(), board.on_board_indices()
+    )
+
+
+# Scores the board of a game state by area, with komi for white
+def compute_game_result(game_state, komi: float = KOMI) -> GameResult:
+    territory = evaluate_territory(game_state.board)
+    return GameResult(territory.black_area, territory.white_area, komi)
@@ -1,31 +1,38 @@
-import itertools
-import random
+import argparse
 
-from dlgo.gotypes import Player, Point
+import numpy as np
 
+from dlgo import zobrist
 
-def to_python(player_state: Player) -> str:
-    if player_state is None:
-        return "None"
-    return str(Player.black) if player_state == Player.black else str(Player.white)
 
+def main():
+    # dlgo.zobrist builds its tables from a seed when it is imported;
+    # this script writes the same tables out, e.g. for other tools
+    # that need to agree with our position hashes.
+    parser = argparse.ArgumentParser(description="Write Zobrist hash tables.")
+    parser.add_argument(
+        "--board-size", type=int, nargs="+", default=[9, 13, 19], dest="board_sizes"
+    )
+    parser.add_argument("--seed", type=int, default=zobrist.SEED)
+    parser.add_argument("--output", default="zobrist_tables.npz")
+    args = parser.parse_args()
 
-MAX63 = 0x7FFFFFFFFFFFFFFF
-table = {}
-empty_board = 0
+    # Per size: the stone codes under "<n>x<n>", plus the codes that
+    # GameState.zobrist_hash mixes in for white to move and ko points
+    tables = {}
+    for board_size in args.board_sizes:
+        table = zobrist.ZobristTable(board_size, board_size, args.seed)
+        size = f"{board_size}x{board_size}"
+        tables[size] = table.stones
+        tables[f"{size}_side_to_move"] = np.uint64(table.side_to_move)
+        tables[f"{size}_ko_point"] = table.ko_point
+        print(
+            f"{size}: {table.stones.shape[0]} cells x {table.stones.shape[1]}, "
+            "side to move, ko points"
+        )
+    np.savez(args.output, seed=np.int64(args.seed), **tables)
+    print(f"Saved to {args.output}")
 
-for row, col in itertools.product(range(1, 20), range(1, 20)):
-    for state in (Player.black, Player.white):
-        code = random.randint(0, MAX63)
-        table[Point(row, col), state] = code
 
-print("from .gotypes import Player, Point")
-print("")
-print("__all__ = ['HASH_CODE', 'EMPTY_BOARD']")
-print("")
-print("HASH_CODE = {")
-for (pt, state), hash_code in table.items():
-    print("    (%r, %s): %r," % (pt, to_python(state), hash_code))
-print("}")
-print("")
-print("EMPTY_BOARD = %d" % (empty_board,))
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from dlgo import goboard_slow as goboard
+from dlgo import goboard_fast as goboard
 from dlgo import gotypes
 from dlgo.agent import naive as agent
 from dlgo.utils import point_from_coords, print_board, print_move
@@ -0,0 +1,69 @@
+import importlib
+import pkgutil
+import random
+import sys
+import threading
+
+import pytest
+
+import dlgo.encoders
+from dlgo import goboard_fast
+
+# Every module of dlgo.encoders with a create function
+ENCODERS = [
+    module.name
+    for module in pkgutil.iter_modules(dlgo.encoders.__path__)
+    if hasattr(importlib.import_module(f"dlgo.encoders.{module.name}"), "create")
+]
+
+
+def _random_positions(board_size, num_moves, seed):
+    rng = random.Random(seed)
+    game_state = goboard_fast.GameState.new_game(board_size)
+    states = [game_state]
+    for _ in range(num_moves):
+        moves = [move for move in game_state.legal_moves() if move.is_play]
+        if not moves:
+            break
+        game_state = game_state.apply_move(rng.choice(moves))
+        states.append(game_state)
+    return states
+
+
+def _run_in_threads(work, num_threads=8):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(work()))
+        for _ in range(num_threads)
+    ]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-7)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return results
+
+
+# The name of each registered encoder in turn
+@pytest.fixture(params=ENCODERS)
+def encoder_name(request):
+    return request.param
+
+
+# random_positions(board_size, num_moves, seed) returns the states
+# along one seeded game of random plays, starting with the empty board
+@pytest.fixture(scope="session")
+def random_positions():
+    return _random_positions
+
+
+# run_in_threads(work) calls work from eight threads at once, switching
+# threads as often as possible so that races show up, and returns the
+# results of all calls
+@pytest.fixture(scope="session")
+def run_in_threads():
+    return _run_in_threads
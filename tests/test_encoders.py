@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from dlgo import goboard_fast
+from dlgo.encoders.base import get_encoder_by_name
+from dlgo.gotypes import Player, Point
+
+
+@pytest.fixture(scope="module")
+def positions(random_positions):
+    # The second game has a few ko captures
+    return random_positions(9, 120, seed=6) + random_positions(9, 200, seed=1)
+
+
+def test_points_round_trip(encoder_name):
+    encoder = get_encoder_by_name(encoder_name, 9)
+    indices = [
+        encoder.encode_point(Point(r, c)) for r in range(1, 10) for c in range(1, 10)
+    ]
+    assert indices == list(range(encoder.num_points()))
+    assert [encoder.decode_point_index(index) for index in indices] == [
+        Point(r, c) for r in range(1, 10) for c in range(1, 10)
+    ]
+
+
+def test_oneplane_marks_own_and_opponent_stones(positions):
+    encoder = get_encoder_by_name("oneplane", 9)
+    for game_state in positions[::10]:
+        encoded = encoder.encode(game_state)
+        for row in range(1, 10):
+            for col in range(1, 10):
+                color = game_state.board.get(Point(row, col))
+                expected = 0 if color is None else 1
+                if color is not None and color != game_state.next_player:
+                    expected = -1
+                assert encoded[0, row - 1, col - 1] == expected
+
+
+def test_encode_batch_matches_encode(encoder_name, positions):
+    encoder = get_encoder_by_name(encoder_name, 9)
+    assert encoder.name() == encoder_name
+    expected = np.stack([encoder.encode(game_state) for game_state in positions])
+    assert expected.shape == (len(positions),) + tuple(encoder.shape())
+    assert expected.dtype == np.float32
+    assert np.array_equal(encoder.encode_batch(positions), expected)
+    # Into a slice of a larger, dirty int8 buffer
+    out = np.full((len(positions) + 2,) + tuple(encoder.shape()), 7, dtype=np.int8)
+    encoder.encode_batch(positions, out[1:-1])
+    assert np.array_equal(out[1:-1], expected)
+    assert (out[0] == 7).all() and (out[-1] == 7).all()
+
+
+def test_sevenplane_counts_liberties_and_marks_ko(positions):
+    encoder = get_encoder_by_name("sevenplane", 9)
+    for game_state in positions[::5]:
+        encoded = encoder.encode(game_state)
+        board = game_state.board
+        for row in range(1, 10):
+            for col in range(1, 10):
+                string = board.get_go_string(Point(row, col))
+                stone_planes = encoded[:6, row - 1, col - 1]
+                if string is None:
+                    assert not stone_planes.any()
+                    continue
+                plane = min(string.num_liberties, 3) - 1
+                if string.color != game_state.next_player:
+                    plane += 3
+                assert stone_planes.tolist() == [i == plane for i in range(6)]
+        ko_point = game_state.ko_point
+        assert encoded[6].sum() == (ko_point is not None)
+        if ko_point is not None:
+            assert encoded[6, ko_point.row - 1, ko_point.col - 1] == 1
+
+
+def handicap_positions():
+    # Like GoDataProcessor.get_handicap: black's setup stones on a
+    # fresh board, white to move, and no last move
+    board = goboard_fast.Board(19, 19)
+    for point in (Point(4, 4), Point(16, 16)):
+        board.place_stone(Player.black, point)
+    game_state = goboard_fast.GameState(board, Player.white, None, None)
+    after_move = game_state.apply_move(goboard_fast.Move.play(Point(4, 16)))
+    return [game_state, after_move]
+
+
+def test_handicap_positions_encode(encoder_name):
+    encoder = get_encoder_by_name(encoder_name, 19)
+    for game_state in handicap_positions():
+        encoded = encoder.encode(game_state)
+        assert encoded.shape == tuple(encoder.shape())
+        # Black's setup stones are the opponent's when white is to move
+        assert encoded.any()
+
+
+def test_handicap_game_from_sgf_encodes(encoder_name):
+    pytest.importorskip("six")
+    from dlgo.data.processor_parallel import GoDataProcessor
+    from dlgo.gosgf.sgf import Sgf_game
+
+    sgf = Sgf_game.from_string(b"(;GM[1]SZ[19]HA[2]AB[dd][pp];W[dp])")
+    game_state, first_move_done = GoDataProcessor.get_handicap(sgf)
+    assert first_move_done
+    assert game_state.last_move is None
+    assert game_state.next_player == Player.white
+    encoder = get_encoder_by_name(encoder_name, 19)
+    encoder.encode(game_state)
+    for item in sgf.main_sequence_iter():
+        color, move_tuple = item.get_move()
+        if color is not None:
+            row, col = move_tuple
+            move = goboard_fast.Move.play(Point(row + 1, col + 1))
+            game_state = game_state.apply_move(move)
+            encoder.encode(game_state)
+
+
+def test_historyplane_marks_stones_by_turns_since_played(positions):
+    encoder = get_encoder_by_name("historyplane", 9)
+    for game_state in positions[::7]:
+        moves = []
+        state = game_state
+        while state.last_move is not None:
+            moves.append(state.last_move)
+            state = state.previous_state
+        # The turn each stone on the board was placed, counting back
+        # from 1 for the last move; replaying keeps the latest placement
+        placed = {}
+        for age, move in enumerate(reversed(moves)):
+            if move.is_play:
+                placed[move.point] = len(moves) - age
+        expected = np.zeros((8, 9, 9))
+        for point, age in placed.items():
+            if game_state.board.get(point) is not None:
+                expected[min(age, 8) - 1, point.row - 1, point.col - 1] = 1
+        encoded = encoder.encode(game_state)
+        assert np.array_equal(encoded[7:], expected)
+        assert np.array_equal(
+            encoded[:7], get_encoder_by_name("sevenplane", 9).encode(game_state)
+        )
+
+
+def test_historyplane_puts_older_moves_of_detached_states_last(positions):
+    encoder = get_encoder_by_name("historyplane", 9)
+    game_state = positions[40]
+    encoded = encoder.encode(game_state.detached())
+    assert np.array_equal(encoded[7:9], encoder.encode(game_state)[7:9])
+    assert encoded[9:14].sum() == 0
+    assert encoded[14].sum() == (game_state.board.stone_array() != 0).sum() - 2
@@ -0,0 +1,215 @@
+import copy
+import pickle
+import random
+import sys
+import threading
+from dataclasses import FrozenInstanceError
+
+import numpy as np
+import pytest
+
+from dlgo import goboard, goboard_fast
+from dlgo.gotypes import Player, Point
+
+
+def random_games(board_size, num_games, num_moves, seed):
+    # Pairs of (goboard_fast, goboard) states along random games, with
+    # an occasional pass so that ko and game ends get exercised too
+    rng = random.Random(seed)
+    for _ in range(num_games):
+        fast = goboard_fast.GameState.new_game(board_size)
+        slow = goboard.GameState.new_game(board_size)
+        pairs = [(fast, slow)]
+        for _ in range(num_moves):
+            moves = [move for move in fast.legal_moves() if move.is_play]
+            if not moves or fast.is_over():
+                break
+            if rng.random() < 0.03:
+                fast = fast.apply_move(goboard_fast.Move.pass_turn())
+                slow = slow.apply_move(goboard.Move.pass_turn())
+            else:
+                point = rng.choice(moves).point
+                fast = fast.apply_move(goboard_fast.Move.play(point))
+                slow = slow.apply_move(goboard.Move.play(point))
+            pairs.append((fast, slow))
+    return pairs
+
+
+def all_points(board_size):
+    return [
+        Point(row, col)
+        for row in range(1, board_size + 1)
+        for col in range(1, board_size + 1)
+    ]
+
+
+@pytest.fixture(scope="module")
+def game_pairs():
+    return random_games(5, 6, 60, seed=1) + random_games(7, 3, 80, seed=2)
+
+
+def test_boards_match_goboard(game_pairs):
+    for fast, slow in game_pairs:
+        board_size = fast.board.num_rows
+        assert fast.board.zobrist_hash() == slow.board.zobrist_hash()
+        assert fast.next_player == slow.next_player
+        for point in all_points(board_size):
+            assert fast.board.get(point) == slow.board.get(point)
+            fast_string = fast.board.get_go_string(point)
+            slow_string = slow.board.get_go_string(point)
+            if slow_string is None:
+                assert fast_string is None
+                continue
+            assert fast.board.points_of(fast_string.stones) == slow_string.stones
+            assert fast.board.points_of(fast_string.liberties) == slow_string.liberties
+
+
+def test_is_valid_move_matches_goboard(game_pairs):
+    for fast, slow in game_pairs[::4]:
+        for point in all_points(fast.board.num_rows):
+            expected = slow.is_valid_move(goboard.Move.play(point))
+            assert fast.is_valid_move(goboard_fast.Move.play(point)) == expected
+
+
+def test_probes_match_goboard_for_both_players(game_pairs):
+    for fast, slow in game_pairs[::4]:
+        for point in all_points(fast.board.num_rows):
+            if fast.board.get(point) is not None:
+                continue
+            fast_move = goboard_fast.Move.play(point)
+            slow_move = goboard.Move.play(point)
+            for player in (Player.black, Player.white):
+                assert fast.is_move_self_capture(
+                    player, fast_move
+                ) == slow.is_move_self_capture(player, slow_move)
+                assert fast.does_move_violate_ko(
+                    player, fast_move
+                ) == slow.does_move_violate_ko(player, slow_move)
+
+
+def test_probes_leave_a_shared_board_alone():
+    # A pass shares its board with the state before it. Probing one
+    # state while another thread copies the board must never show the
+    # copy a probe stone.
+    game_state = goboard_fast.GameState.new_game(9)
+    game_state = game_state.apply_move(goboard_fast.Move.play(Point(5, 5)))
+    passed = game_state.apply_move(goboard_fast.Move.pass_turn())
+    assert passed.board is game_state.board
+    expected = game_state.board.cells()
+    moves = [
+        goboard_fast.Move.play(point)
+        for point in all_points(9)
+        if game_state.board.get(point) is None
+    ]
+    started = threading.Event()
+    done = threading.Event()
+
+    def probe():
+        while not done.is_set():
+            for move in moves:
+                passed.is_valid_move(move)
+                passed.is_move_self_capture(Player.black, move)
+                passed.does_move_violate_ko(Player.black, move)
+            started.set()
+
+    thread = threading.Thread(target=probe)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-7)
+    thread.start()
+    try:
+        assert started.wait(10)
+        for _ in range(5000):
+            assert copy.deepcopy(game_state.board).cells() == expected
+    finally:
+        done.set()
+        thread.join()
+        sys.setswitchinterval(interval)
+
+
+def test_push_and_pop_restore_the_board(game_pairs):
+    for fast, _ in game_pairs[::3]:
+        board = fast.board
+        before = copy.deepcopy(board)
+        for move in fast.legal_moves():
+            if not move.is_play:
+                continue
+            board.push_stone(fast.next_player, move.point)
+            board.pop_stone()
+        assert board.cells() == before.cells()
+        assert (board.liberty_array() == before.liberty_array()).all()
+        assert board.zobrist_hash() == before.zobrist_hash()
+        for index in board.on_board_indices():
+            assert board.string_at(index) is before.string_at(index)
+
+
+def test_evaluate_move_agrees_with_is_valid_move(game_pairs):
+    for fast, _ in game_pairs[::4]:
+        for point in all_points(fast.board.num_rows):
+            move = goboard_fast.Move.play(point)
+            assert fast.evaluate_move(move).is_legal == fast.is_valid_move(move)
+
+
+def test_legal_moves_match_goboard(game_pairs):
+    for fast, slow in game_pairs[::4]:
+        board_size = fast.board.num_rows
+        legal = {move.point for move in fast.legal_moves() if move.is_play}
+        expected = {
+            point
+            for point in all_points(board_size)
+            if slow.is_valid_move(goboard.Move.play(point))
+        }
+        assert legal == expected
+        mask = fast.legal_move_mask()
+        assert {Point(r + 1, c + 1) for r, c in zip(*np.nonzero(mask))} == legal
+
+
+def test_ko_point_forbids_immediate_recapture():
+    # Black takes the white stone at (2, 2) with a stone at (2, 3) that
+    # has (2, 2) as its only liberty, so white may not retake at once
+    moves = [(1, 2), (1, 3), (2, 1), (3, 3), (3, 2), (2, 4), (5, 5), (2, 2), (2, 3)]
+    game_state = goboard_fast.GameState.new_game(5)
+    for row, col in moves:
+        game_state = game_state.apply_move(goboard_fast.Move.play(Point(row, col)))
+    assert game_state.next_player == Player.white
+    assert game_state.board.get(Point(2, 2)) is None
+    assert game_state.ko_point == Point(2, 2)
+    assert not game_state.is_valid_move(goboard_fast.Move.play(Point(2, 2)))
+    # After a move elsewhere the ko may be taken back
+    game_state = game_state.apply_move(goboard_fast.Move.play(Point(5, 1)))
+    game_state = game_state.apply_move(goboard_fast.Move.play(Point(4, 5)))
+    assert game_state.ko_point is None
+    assert game_state.is_valid_move(goboard_fast.Move.play(Point(2, 2)))
+
+
+def test_liberty_array_matches_strings(game_pairs):
+    for fast, _ in game_pairs:
+        board = fast.board
+        liberties = board.liberty_array()
+        for point in all_points(board.num_rows):
+            string = board.get_go_string(point)
+            expected = 0 if string is None else string.num_liberties
+            assert liberties[point.row - 1, point.col - 1] == expected
+
+
+def test_moves_are_shared_and_immutable():
+    point = Point(2, 3)
+    for move in (
+        goboard_fast.Move.play(point),
+        goboard_fast.Move.pass_turn(),
+        goboard_fast.Move.resign(),
+    ):
+        assert copy.copy(move) is move
+        assert copy.deepcopy(move) is move
+        assert pickle.loads(pickle.dumps(move)) is move
+        with pytest.raises(FrozenInstanceError):
+            move.is_play = not move.is_play
+    assert goboard_fast.Move.play(point) is goboard_fast.Move.play(Point(2, 3))
+
+
+def test_moves_are_interned_across_threads(run_in_threads):
+    for row in range(1000, 1020):
+        results = run_in_threads(
+            lambda: [goboard_fast.Move.play(Point(row, col)) for col in range(50)]
+        )
+        for moves in results[1:]:
+            assert all(a is b for a, b in zip(results[0], moves))
@@ -0,0 +1,25 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from dlgo.gotypes import Point
+
+
+def test_points_are_interned_across_threads(run_in_threads):
+    # Rows far off any board, so no test has interned these points yet
+    for row in range(1000, 1020):
+        results = run_in_threads(lambda: [Point(row, col) for col in range(50)])
+        for points in results[1:]:
+            assert all(a is b for a, b in zip(results[0], points))
+
+
+def test_points_are_immutable_and_copies_are_the_same_instance():
+    point = Point(3, 4)
+    assert Point(3, 4) is point
+    assert copy.copy(point) is point
+    assert copy.deepcopy(point) is point
+    assert pickle.loads(pickle.dumps(point)) is point
+    with pytest.raises(FrozenInstanceError):
+        point.row = 5
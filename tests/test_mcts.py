@@ -0,0 +1,263 @@
+import gc
+import random
+import weakref
+
+import numpy as np
+import pytest
+
+from dlgo.agent import search_budget
+from dlgo.agent.mcts import MCTSAgent, MCTSNode, TranspositionTable, transposition_key
+from dlgo.agent.mcts_parallel import LEAF_PARALLEL, ROOT_PARALLEL, ParallelMCTSAgent
+from dlgo.agent.mcts_threaded import (
+    BLACK_WINS,
+    ROLLOUTS,
+    VIRTUAL_LOSSES,
+    WHITE_WINS,
+    SharedStatistics,
+    ThreadedMCTSAgent,
+    ThreadedMCTSNode,
+)
+from dlgo.agent.search_budget import SearchBudget
+from dlgo.goboard_fast import GameState, Move
+from dlgo.gotypes import Player, Point
+
+
+def expand(node, move, transpositions=None):
+    # Adds the child of node reached by move and returns it
+    index = node.unvisited_moves.index(move)
+    return node.add_random_child(transpositions, index)
+
+
+def test_transpositions_share_one_node():
+    a, b, c = (Move.play(Point(row, 1)) for row in (1, 3, 5))
+    transpositions = TranspositionTable(100)
+    root = MCTSNode(GameState.new_game(5))
+    transpositions.put(transposition_key(root.game_state), root)
+    first = expand(expand(root, a, transpositions), b, transpositions)
+    first_leaf = expand(first, c, transpositions)
+    second = expand(expand(root, c, transpositions), b, transpositions)
+    second_leaf = expand(second, a, transpositions)
+
+    assert second_leaf is first_leaf
+    assert [parent for parent, _ in first_leaf._slots] == [first, second]
+    # A rollout through one path counts in the statistics of both
+    # parents, as a win for black, who plays c or a there
+    first_leaf.record_win(Player.black)
+    for parent in (first, second):
+        assert parent.child_visits[parent.children.index(first_leaf)] == 1
+        assert parent.child_wins[parent.children.index(first_leaf)] == 1
+        assert parent.total_visits == 1
+
+
+def play(game_state, *moves):
+    for move in moves:
+        game_state = game_state.apply_move(move)
+    return game_state
+
+
+def test_positions_reached_by_a_pass_are_not_shared():
+    # One more pass ends the game in the first position but not in the
+    # second, though stones and side to move match
+    a, b = Move.play(Point(3, 3)), Move.play(Point(1, 1))
+    passed = play(GameState.new_game(5), a, b, Move.pass_turn())
+    played = play(GameState.new_game(5), Move.pass_turn(), b, a)
+    assert passed.zobrist_hash() == played.zobrist_hash()
+    assert transposition_key(passed) != transposition_key(played)
+
+
+def test_transposition_table_drops_the_least_recently_used_entry():
+    nodes = [MCTSNode(GameState.new_game(5)) for _ in range(3)]
+    table = TranspositionTable(2)
+    table.put("a", nodes[0])
+    table.put("b", nodes[1])
+    assert table.get("a") is nodes[0]
+    table.put("c", nodes[2])
+    assert len(table) == 2
+    assert table.get("b") is None
+    assert table.get("a") is nodes[0]
+    assert table.get("c") is nodes[2]
+
+
+def reachable(root):
+    nodes = [root]
+    seen = {id(root)}
+    for node in nodes:
+        for child in node.children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                nodes.append(child)
+    return nodes
+
+
+def test_search_continues_from_the_subtree_of_the_moves_played():
+    random.seed(1)
+    agent = MCTSAgent(200, 1.5, transposition_table_size=1000)
+    game_state = GameState.new_game(5)
+    move = agent.select_move(game_state)
+    old_root = agent._root
+    node = old_root.children[old_root.child_moves.index(move)]
+    reply = node.child_moves[0]
+    subtree = node.children[0]
+    old_root = weakref.ref(old_root)
+
+    new_root = agent.start_search(play(game_state, move, reply))
+    assert new_root is subtree
+    assert new_root.parent is None
+    nodes = reachable(new_root)
+    keep = {id(node) for node in nodes}
+    for node in nodes:
+        assert node.parent is None or id(node.parent) in keep
+        assert all(id(parent) in keep for parent, _ in node._slots)
+    assert all(id(node) in keep for node in agent.transpositions._nodes.values())
+    del node, subtree, nodes
+    gc.collect()
+    assert old_root() is None
+
+
+def test_search_starts_over_away_from_the_last_tree():
+    random.seed(2)
+    agent = MCTSAgent(50, 1.5)
+    game_state = GameState.new_game(5)
+    agent.select_move(game_state)
+    other = play(GameState.new_game(5), Move.play(Point(1, 1)))
+    root = agent.start_search(other)
+    assert root.game_state is other
+    assert root.children == []
+    assert agent._root is root
+
+
+@pytest.mark.parametrize("parallelism", [ROOT_PARALLEL, LEAF_PARALLEL])
+def test_parallel_agent_returns_a_legal_interned_move(parallelism):
+    game_state = play(GameState.new_game(5), Move.play(Point(3, 3)))
+    with ParallelMCTSAgent(40, 1.5, parallelism, num_workers=2) as agent:
+        move = agent.select_move(game_state)
+        assert agent._pool is not None
+    assert agent._pool is None
+    # Moves are compared by identity, so only the interned move is legal
+    assert move in game_state.legal_moves()
+
+
+def test_parallel_agent_stops_its_pool_when_discarded():
+    agent = ParallelMCTSAgent(8, 1.5, num_workers=2)
+    agent.select_move(GameState.new_game(5))
+    pool = agent._pool
+    del agent
+    gc.collect()
+    with pytest.raises(ValueError):
+        pool.map(abs, [1])
+
+
+def test_threaded_agent_returns_a_legal_move():
+    game_state = play(GameState.new_game(5), Move.play(Point(3, 3)))
+    agent = ThreadedMCTSAgent(60, 1.5, num_threads=4)
+    assert agent.select_move(game_state) in game_state.legal_moves()
+
+
+def test_threaded_rounds_leave_consistent_statistics(run_in_threads):
+    agent = ThreadedMCTSAgent(0, 1.5)
+    stats = SharedStatistics(1000, num_stripes=4)
+    root = ThreadedMCTSNode(GameState.new_game(5), stats.allocate())
+
+    def work():
+        for _ in range(20):
+            agent._run_round(root, stats)
+
+    run_in_threads(work)
+    counts = stats.counts[: len(stats)]
+    assert counts[root.row, ROLLOUTS] == 8 * 20
+    assert (counts[:, VIRTUAL_LOSSES] == 0).all()
+    assert (counts[:, BLACK_WINS] + counts[:, WHITE_WINS] == counts[:, ROLLOUTS]).all()
+
+
+def fully_expanded_root(leader_wins, other_wins, rollouts):
+    # A root with every move expanded, and each child's rollouts won
+    # by the player to move at the root leader_wins times for the
+    # first child and other_wins times for the rest
+    root = MCTSNode(GameState.new_game(5))
+    while root.can_add_child():
+        root.add_random_child()
+    for index, child in enumerate(root.children):
+        wins = leader_wins if index == 0 else other_wins
+        for rollout in range(rollouts):
+            child.record_win(Player.black if rollout < wins else Player.white)
+    return root
+
+
+def test_is_decided_once_no_other_child_can_catch_up():
+    root = fully_expanded_root(9, 1, 10)
+    # With 5 rounds left the leader drops to 9/15 at worst and the
+    # others reach 6/15 at best; with 20 left, 9/30 against 21/30
+    assert MCTSAgent.is_decided(root, 5)
+    assert not MCTSAgent.is_decided(root, 20)
+    assert MCTSAgent.is_decided(root, 0)
+
+
+def test_is_not_decided_while_moves_are_unexpanded():
+    root = fully_expanded_root(9, 1, 10)
+    root.unvisited_moves.append(Move.pass_turn())
+    assert not MCTSAgent.is_decided(root, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rounds_left_counts_down_rounds_and_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(search_budget.time, "perf_counter", clock)
+    budget = SearchBudget(max_rounds=25, seconds=2.0)
+    budget.start()
+    assert budget.rounds_left() == 25
+    for _ in range(10):
+        budget.record_round()
+    clock.now += 0.5
+    # 20 rounds per second for the 1.5 seconds left
+    assert budget.rounds_left() == 15
+    budget.max_rounds = None
+    assert budget.rounds_left() == pytest.approx(30)
+    clock.now += 2.0
+    assert budget.rounds_left() == 0
+    assert not budget.resources_left()
+
+
+def test_time_budget_has_no_estimate_before_the_first_round():
+    budget = SearchBudget(seconds=1.0)
+    budget.start()
+    assert budget.rounds_left() == float("inf")
+    assert budget.resources_left()
+    budget.stop()
+    assert not budget.resources_left()
+
+
+def test_search_budget_needs_a_limit():
+    with pytest.raises(ValueError):
+        SearchBudget()
+
+
+def test_amaf_counts_the_points_each_player_played_first():
+    a, b, c, d, e = (Move.play(Point(row, 4)) for row in range(1, 6))
+    root = MCTSNode(GameState.new_game(5))
+    child = expand(root, a)
+    leaf = expand(child, b)
+    board = root.game_state.board
+    index = {move: board.index_of(move.point) for move in (a, b, c, d, e)}
+    # From the leaf black plays c, white passes, black d, white e, then
+    # black b after a capture. In the tree black played a and white b.
+    rollout = [index[c], -1, index[d], index[e], index[b]]
+    MCTSAgent.backpropagate_amaf([root, child, leaf], Player.black, rollout)
+
+    # Black moves at the root and at the leaf; white's b in the tree
+    # comes before black's, so only the leaf counts b for black
+    expected = {
+        root: ({a, c, d}, True),
+        child: ({b, e}, False),
+        leaf: ({b, c, d}, True),
+    }
+    for node, (moves, won) in expected.items():
+        played = sorted(index[move] for move in moves)
+        assert np.flatnonzero(node.amaf_visits).tolist() == played
+        assert np.flatnonzero(node.amaf_wins).tolist() == (played if won else [])
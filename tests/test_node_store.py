@@ -0,0 +1,76 @@
+import random
+
+from dlgo.agent.mcts_compact import CompactMCTSAgent
+from dlgo.agent.node_store import ROOT, NodeStore
+from dlgo.goboard_fast import GameState, Move
+from dlgo.gotypes import Player, Point
+
+A, B, C = (Move.play(Point(row, 2)) for row in (1, 3, 5))
+
+
+def line_store(state_cache_size=4096):
+    # Root, then a child for A and B, and under A a child for C
+    store = NodeStore(capacity=2, state_cache_size=state_cache_size)
+    store.reset(GameState.new_game(5))
+    first = store.expand(ROOT, [A, B])
+    store.expand(first, [C])
+    return store
+
+
+def test_backpropagate_credits_the_player_who_chose_each_node():
+    store = line_store()
+    a = int(store.first_child[ROOT])
+    c = int(store.first_child[a])
+    path = [ROOT, a, c]
+    # Black, to move at the root, plays A; white plays C
+    store.backpropagate(path, Player.black)
+    assert store.visits[path].tolist() == [1, 1, 1]
+    assert store.wins[path].tolist() == [0, 1, 0]
+    store.backpropagate(path, Player.white)
+    assert store.visits[path].tolist() == [2, 2, 2]
+    assert store.wins[path].tolist() == [1, 1, 1]
+
+
+def test_arrays_grow_past_their_capacity():
+    store = line_store()
+    assert store.capacity >= len(store) == 4
+    assert [store.decode_move(int(store.move[n])) for n in range(1, 4)] == [A, B, C]
+    assert store.parent[:4].tolist() == [-1, 0, 0, 1]
+
+
+def test_state_replays_the_moves_from_the_root():
+    store = line_store()
+    c = int(store.first_child[store.first_child[ROOT]])
+    state = store.state(c)
+    expected = GameState.new_game(5).apply_move(A).apply_move(C)
+    assert state.board.cells() == expected.board.cells()
+    assert state.next_player == expected.next_player
+    assert store.state(c) is state
+
+
+def test_state_cache_drops_the_least_recently_used_state():
+    store = line_store(state_cache_size=2)
+    a, b = store.children(ROOT)
+    c = int(store.first_child[a])
+    # c's state is replayed through a's, caching both
+    store.state(c)
+    state_a = store.state(a)
+    store.state(b)
+    assert list(store._states) == [a, b]
+    assert store.state(a) is state_a
+    replayed = store.state(c)
+    assert list(store._states) == [a, c]
+    assert replayed.board.cells() == state_a.apply_move(C).board.cells()
+
+
+def test_moves_round_trip_through_their_codes():
+    store = line_store()
+    for move in (A, B, C, Move.pass_turn(), Move.resign()):
+        assert store.decode_move(store.encode_move(move)) is move
+
+
+def test_compact_agent_returns_a_legal_move():
+    random.seed(3)
+    game_state = GameState.new_game(5).apply_move(Move.play(Point(3, 3)))
+    agent = CompactMCTSAgent(100, 1.5, capacity=16)
+    assert agent.select_move(game_state) in game_state.legal_moves()
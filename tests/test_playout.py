@@ -0,0 +1,59 @@
+import random
+
+from dlgo import goboard_fast
+from dlgo.playout import play_random_game
+from dlgo.scoring import compute_game_result
+
+
+def replay(game_state, moves):
+    # Plays recorded flat indices on goboard_fast, checking that each
+    # one follows the playout's rules: a legal play by simple ko that
+    # doesn't fill the player's own eye
+    for index in moves:
+        if index < 0:
+            game_state = game_state.apply_move(goboard_fast.Move.pass_turn())
+            continue
+        board = game_state.board
+        point = board.point_of(index)
+        move = goboard_fast.Move.play(point)
+        assert board.get(point) is None
+        assert point != game_state.ko_point
+        assert not game_state.is_move_self_capture(game_state.next_player, move)
+        assert not board.is_eye(index, game_state.next_player)
+        game_state = game_state.apply_move(move)
+    return game_state
+
+
+def test_random_games_follow_the_rules_and_score_like_goboard_fast():
+    random.seed(4)
+    for board_size in (5, 9):
+        start = goboard_fast.GameState.new_game(board_size)
+        for _ in range(30):
+            moves = []
+            winner = play_random_game(start, moves=moves)
+            end = replay(start, moves)
+            assert winner == compute_game_result(end).winner
+
+
+def test_playout_from_a_position_in_progress():
+    random.seed(5)
+    game_state = goboard_fast.GameState.new_game(9)
+    for _ in range(40):
+        moves = [move for move in game_state.legal_moves() if move.is_play]
+        game_state = game_state.apply_move(random.choice(moves))
+    for _ in range(20):
+        moves = []
+        winner = play_random_game(game_state, moves=moves)
+        assert winner == compute_game_result(replay(game_state, moves)).winner
+
+
+def test_finished_games_are_not_played_on():
+    game_state = goboard_fast.GameState.new_game(5)
+    game_state = game_state.apply_move(goboard_fast.Move.play(goboard_fast.Point(3, 3)))
+    resigned = game_state.apply_move(goboard_fast.Move.resign())
+    assert play_random_game(resigned) == resigned.next_player
+    moves = []
+    passed = game_state.apply_move(goboard_fast.Move.pass_turn())
+    passed = passed.apply_move(goboard_fast.Move.pass_turn())
+    assert play_random_game(passed, moves=moves) == passed.winner()
+    assert moves == []
@@ -0,0 +1,75 @@
+import random
+
+from dlgo import goboard_fast
+from dlgo.gotypes import Player, Point
+from dlgo.scoring import GameResult, compute_game_result, evaluate_territory
+
+
+def reference_areas(board):
+    # Tromp-Taylor areas by a breadth-first search over Points
+    size = board.num_rows
+    areas = {Player.black: 0, Player.white: 0}
+    seen = set()
+    for row in range(1, size + 1):
+        for col in range(1, size + 1):
+            point = Point(row, col)
+            color = board.get(point)
+            if color is not None:
+                areas[color] += 1
+                continue
+            if point in seen:
+                continue
+            region, borders, queue = [], set(), [point]
+            seen.add(point)
+            while queue:
+                current = queue.pop()
+                region.append(current)
+                for neighbor in current.neighbors():
+                    if not board.is_on_grid(neighbor):
+                        continue
+                    neighbor_color = board.get(neighbor)
+                    if neighbor_color is not None:
+                        borders.add(neighbor_color)
+                    elif neighbor not in seen:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+            if len(borders) == 1:
+                areas[borders.pop()] += len(region)
+    return areas[Player.black], areas[Player.white]
+
+
+def test_area_matches_breadth_first_search():
+    rng = random.Random(3)
+    for board_size in (5, 9, 13):
+        for _ in range(20):
+            game_state = goboard_fast.GameState.new_game(board_size)
+            for _ in range(rng.randrange(board_size * board_size * 2)):
+                moves = [move for move in game_state.legal_moves() if move.is_play]
+                if not moves:
+                    break
+                game_state = game_state.apply_move(rng.choice(moves))
+            territory = evaluate_territory(game_state.board)
+            black, white = reference_areas(game_state.board)
+            assert (territory.black_area, territory.white_area) == (black, white)
+            result = compute_game_result(game_state)
+            assert (result.b, result.w) == (black, white)
+
+
+def test_game_result_applies_komi():
+    assert GameResult(41, 40, 0.5).winner == Player.black
+    assert GameResult(41, 40, 1.5).winner == Player.white
+    assert GameResult(41, 40, 1.5).winning_margin == 0.5
+    assert str(GameResult(41, 40, 1.5)) == "W+0.5"
+    assert str(GameResult(50, 40, 7.5)) == "B+2.5"
+
+
+def test_winner_of_finished_games():
+    game_state = goboard_fast.GameState.new_game(5)
+    assert game_state.winner() is None
+    game_state = game_state.apply_move(goboard_fast.Move.play(Point(3, 3)))
+    passed = game_state.apply_move(goboard_fast.Move.pass_turn())
+    passed = passed.apply_move(goboard_fast.Move.pass_turn())
+    # 25 points of black area against 7.5 komi
+    assert passed.winner() == Player.black
+    resigned = game_state.apply_move(goboard_fast.Move.resign())
+    assert resigned.winner() == Player.black
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from dlgo import goboard_fast
+from dlgo.data.dataset import write_dataset
+from dlgo.data.generator import DataGenerator
+from dlgo.data.storage import load_features, pack_features, save_features
+from dlgo.encoders.base import get_encoder_by_name
+from dlgo.gotypes import Player, Point
+
+
+def test_binary_encoders_only_encode_0_and_1(encoder_name, random_positions):
+    encoder = get_encoder_by_name(encoder_name, 9)
+    features = encoder.encode_batch(random_positions(9, 80, seed=2))
+    assert ((features == 0) | (features == 1)).all() == encoder.binary()
+
+
+def test_saved_features_load_back(encoder_name, random_positions, tmp_path):
+    encoder = get_encoder_by_name(encoder_name, 9)
+    positions = random_positions(9, 40, seed=3)
+    features = np.zeros((len(positions),) + encoder.shape(), dtype=np.int8)
+    encoder.encode_batch(positions, features)
+    file_name = str(tmp_path / "chunk.npy")
+    save_features(file_name, features, encoder.binary())
+    loaded = load_features(file_name, encoder.shape())
+    assert loaded.dtype == np.float32
+    assert np.array_equal(loaded, features)
+
+
+def test_format_follows_the_encoder_not_the_values(tmp_path):
+    # Black to move with only black stones: oneplane encodes no -1,
+    # but every chunk of a oneplane data set is still stored as int8,
+    # so it loads without the encoder's shape.
+    encoder = get_encoder_by_name("oneplane", 9)
+    board = goboard_fast.Board(9, 9)
+    board.place_stone(Player.black, Point(3, 3))
+    game_state = goboard_fast.GameState(board, Player.black, None, None)
+    features = encoder.encode_batch([game_state])
+    assert pack_features(features, encoder.binary()).dtype == np.int8
+
+    file_name = str(tmp_path / "game_features_0.npy")
+    save_features(file_name, features, encoder.binary())
+    np.save(file_name.replace("features", "labels"), np.zeros(1, np.int16))
+    assert np.array_equal(load_features(file_name), features)
+    dataset = write_dataset(str(tmp_path), "train", {"game": [file_name]}, (1, 9, 9))
+    assert dataset.features.dtype == np.int8
+
+
+def test_packing_values_other_than_0_and_1_fails():
+    with pytest.raises(ValueError):
+        pack_features(np.array([[-1, 0, 1]]), packed=True)
+
+
+def test_data_generator_reads_the_chunks_of_the_sampled_games(
+    random_positions, tmp_path
+):
+    encoder = get_encoder_by_name("oneplane", 9)
+    features = encoder.encode_batch(random_positions(9, 29, seed=4))
+    labels = np.arange(len(features), dtype=np.int16)
+    chunks = {"KGS-atrain": [0, 10], "KGS-btrain": [20]}
+    for data_file_name, starts in chunks.items():
+        for chunk, start in enumerate(starts):
+            base = f"{tmp_path}/{data_file_name}_%s_{chunk}.npy"
+            rows = slice(start, start + 10)
+            save_features(base % "features", features[rows], encoder.binary())
+            np.save(base % "labels", labels[rows])
+
+    samples = [("KGS-a.tar.gz", 3), ("KGS-a.tar.gz", 5)]
+    generator = DataGenerator(str(tmp_path), samples, encoder.shape())
+    assert generator.get_num_samples(batch_size=10, num_classes=81) == 20
+    batches = generator.generate(batch_size=10, num_classes=81)
+    for start in (0, 10, 0):
+        x, y = next(batches)
+        assert np.array_equal(x, features[start : start + 10])
+        assert np.array_equal(y.argmax(axis=1), labels[start : start + 10])